@@ -4,6 +4,8 @@ import logging
 import os
 import signal
 import subprocess
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from playwright.async_api import async_playwright, BrowserContext, Page
 
@@ -16,6 +18,13 @@ _pw = None
 _context: BrowserContext | None = None
 _main_page: Page | None = None
 DEFAULT_TIMEOUT_MS = 90000
+MAX_USES_PER_PAGE = 25
+_page_scripts: list[str] = []
+_page_pool: list[Page] = []
+_page_uses: dict[Page, int] = {}
+_launch_lock = asyncio.Lock()
+# Set once Classroom has loaded signed-in in this browser session
+_signed_in = False
 
 
 def _cleanup_stale_browser() -> None:
@@ -45,11 +54,27 @@ def _cleanup_stale_browser() -> None:
             pass
 
 
-async def get_browser_context() -> BrowserContext:
-    global _pw, _context
+def register_page_script(script: str) -> None:
+    """Register JS that every page in the browser context runs on navigation.
+
+    Call at import time: scripts are installed once when the context launches.
+    """
+    if script not in _page_scripts:
+        _page_scripts.append(script)
 
+
+async def get_browser_context() -> BrowserContext:
     if _context:
         return _context
+    # Concurrent callers (e.g. background sheet logging) must not launch twice
+    async with _launch_lock:
+        if _context:
+            return _context
+        return await _launch_context()
+
+
+async def _launch_context() -> BrowserContext:
+    global _pw, _context
 
     settings.browser_data_dir.mkdir(parents=True, exist_ok=True)
 
@@ -71,6 +96,8 @@ async def get_browser_context() -> BrowserContext:
     )
     _context.set_default_timeout(DEFAULT_TIMEOUT_MS)
     _context.set_default_navigation_timeout(DEFAULT_TIMEOUT_MS)
+    for script in _page_scripts:
+        await _context.add_init_script(script)
 
     logger.info("Browser launched with persistent session")
     return _context
@@ -103,24 +130,116 @@ async def new_page() -> Page:
     return page
 
 
-async def safe_goto(page: Page, url: str, wait_selector: str | None = None, timeout: int = 60000) -> None:
-    """Navigate and optionally wait for a selector to appear."""
+async def acquire_page() -> Page:
+    """Check out a warm tab from the pool, opening a new one if none is idle."""
+    while _page_pool:
+        page = _page_pool.pop()
+        if not page.is_closed():
+            return page
+        _page_uses.pop(page, None)
+    return await new_page()
+
+
+async def release_page(page: Page, recycle: bool = False) -> None:
+    """Return a tab to the pool; close it when recycled or worn out."""
+    uses = _page_uses.pop(page, 0) + 1
+    if recycle or uses >= MAX_USES_PER_PAGE or page.is_closed():
+        try:
+            await page.close()
+        except Exception:
+            pass
+        return
+
     try:
-        await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        # Park idle tabs on a blank document so the SPA stops polling
+        await page.goto("about:blank")
     except Exception:
-        logger.warning("Slow page load for %s, continuing anyway", url)
+        try:
+            await page.close()
+        except Exception:
+            pass
+        return
+    _page_uses[page] = uses
+    _page_pool.append(page)
+
+
+@asynccontextmanager
+async def page_scope() -> AsyncIterator[Page]:
+    """Borrow a pooled tab for one operation; it goes back to the pool afterwards
+    (or is closed if the operation raised)."""
+    page = await acquire_page()
+    recycle = True
+    try:
+        yield page
+        recycle = False
+    finally:
+        await release_page(page, recycle=recycle)
+
 
-    # Always give the SPA time to hydrate
-    await asyncio.sleep(3)
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+_BLOCKED_HOST_PARTS = ("googleads.", "doubleclick.net", "google-analytics.com", "ogs.google.com")
 
-    if wait_selector:
+
+async def _block_heavy(route) -> None:
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(
+        part in request.url for part in _BLOCKED_HOST_PARTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+@asynccontextmanager
+async def lean_page(page: Page) -> AsyncIterator[Page]:
+    """Skip images, fonts, media and ad/analytics hosts on `page` for the block.
+
+    For Gmail/Sheets chores that never look at imagery. Stylesheets still load:
+    visibility checks depend on layout. Off when BLOCK_HEAVY_RESOURCES=false.
+    """
+    if not settings.block_heavy_resources:
+        yield page
+        return
+    await page.route("**/*", _block_heavy)
+    try:
+        yield page
+    finally:
         try:
-            await page.wait_for_selector(wait_selector, timeout=15000)
+            await page.unroute("**/*", _block_heavy)
         except Exception:
-            logger.debug("Selector %s not found on %s, continuing", wait_selector, url)
+            pass
+
+
+async def safe_goto(
+    page: Page,
+    url: str,
+    wait_selector: str | None = None,
+    timeout: int = 60000,
+    referer: str | None = None,
+) -> None:
+    """Navigate, then wait for wait_selector (or a fixed hydration pause without one)."""
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=timeout, referer=referer)
+    except Exception:
+        logger.warning("Slow page load for %s, continuing anyway", url)
+
+    if not wait_selector:
+        # Nothing to wait on; give the SPA a moment to hydrate
+        await asyncio.sleep(3)
+        return
+
+    try:
+        await page.wait_for_selector(wait_selector, timeout=15000)
+    except Exception:
+        logger.debug("Selector %s not found on %s, continuing", wait_selector, url)
 
 
 async def check_logged_in(page: Page) -> bool:
+    global _signed_in
+    if _signed_in:
+        # The persistent profile keeps the cookies; no need to bounce through sign-in again
+        return True
+
     print("\nOpening Google sign-in...")
 
     # Go directly to Google Accounts sign-in targeting Classroom
@@ -134,13 +253,17 @@ async def check_logged_in(page: Page) -> bool:
     except Exception:
         pass
 
-    await asyncio.sleep(3)
+    # A signed-in profile is redirected straight to Classroom
+    try:
+        await page.wait_for_url("https://classroom.google.com/**", timeout=3000)
+    except Exception:
+        pass
 
-    # Check if already signed in (redirected straight to Classroom)
     current = page.url
     if "classroom.google.com" in current and "accounts.google.com" not in current:
         print("Already signed in!")
         logger.info("Already signed in to Classroom")
+        _signed_in = True
         return True
 
     print("\n" + "=" * 60)
@@ -161,6 +284,7 @@ async def check_logged_in(page: Page) -> bool:
     if "classroom.google.com" in final_url or "classroom.google.com" in (await page.title()).lower():
         logger.info("Sign-in complete")
         print("Signed in successfully!")
+        _signed_in = True
         return True
     else:
         # One more try: navigate to classroom now that cookies should be set
@@ -170,6 +294,7 @@ async def check_logged_in(page: Page) -> bool:
             if "classroom.google.com" in page.url:
                 logger.info("Sign-in complete (after redirect)")
                 print("Signed in successfully!")
+                _signed_in = True
                 return True
         except Exception:
             pass
@@ -181,8 +306,11 @@ async def check_logged_in(page: Page) -> bool:
 
 
 async def close_browser():
-    global _pw, _context, _main_page
+    global _pw, _context, _main_page, _signed_in
     _main_page = None
+    _signed_in = False
+    _page_pool.clear()
+    _page_uses.clear()
     if _context:
         await _context.close()
         _context = None
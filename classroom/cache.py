@@ -0,0 +1,49 @@
+import json
+import logging
+import time
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def load() -> dict:
+    """Return the enrichment cache keyed by assignment URL ({} if missing/corrupt)."""
+    path = settings.enrich_cache_file
+    if not path.exists():
+        return {}
+
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(payload, dict):
+            raise ValueError("cache root is not an object")
+        return payload
+    except Exception as exc:
+        logger.warning("Failed to read enrichment cache; ignoring: %s", exc)
+        return {}
+
+
+def save(cache: dict) -> None:
+    path = settings.enrich_cache_file
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding="utf-8")
+    except Exception as exc:
+        logger.warning("Failed to write enrichment cache: %s", exc)
+
+
+def lookup(cache: dict, url: str, due_text: str) -> dict | None:
+    """Return the cached enrichment for url if it is still usable.
+
+    Entries expire after ENRICH_CACHE_TTL_HOURS, when the due text changes, or
+    when they carry no content (usually a detail page that never rendered).
+    """
+    entry = cache.get(url)
+    if not entry or entry.get("due_text") != due_text:
+        return None
+    age = time.time() - float(entry.get("fetched_at", 0))
+    if age > settings.enrich_cache_ttl_hours * 3600:
+        return None
+    if not entry.get("description") and not entry.get("attachment_urls"):
+        return None
+    return entry
@@ -2,12 +2,13 @@ import asyncio
 import logging
 import random
 import re
+import weakref
 from dataclasses import dataclass
 
 from playwright.async_api import Locator, Page
 
 from browser.ap_session import ap_session_exists, close_ap_browser, get_ap_page
-from browser.session import get_page
+from browser.session import get_page, register_page_script
 from config.settings import settings
 from classroom.playwright_utils import (
     MOD_KEY,
@@ -33,10 +34,9 @@ from classroom.submission_handler import (
     fill_doc_sections,
     smart_fill_fields,
     summarize_attachment_context,
-    _extract_editable_fields,
-    _extract_questions_from_page,
+    _extract_all,
 )
-from drafting.llm_drafter import generate_structured_answers
+from drafting.llm_async import generate_structured_answers_async
 
 logger = logging.getLogger(__name__)
 
@@ -47,9 +47,71 @@ HUMAN_TYPING_MAX_DELAY_MS = 42
 TEMPLATE_MAX_FIELDS = 24
 MIN_TEMPLATE_PROMPTS = 2
 
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_ASSIGNMENT_ID_RE = re.compile(r"/a/([^/?#]+)")
+_DOC_ID_RE = re.compile(r"/document/d/([^/?#]+)")
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_UNDER_RE = re.compile(r"__(.+?)__")
+_CODE_RE = re.compile(r"`([^`]+)`")
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s*", re.MULTILINE)
+_TEXT_TAG_RE = re.compile(r"<\s*text\s*>", re.IGNORECASE)
+_ANSWER_TAG_RE = re.compile(r"<\s*answer\s*>", re.IGNORECASE)
+_INSERT_RE = re.compile(r"\[\s*insert[^\]]*\]", re.IGNORECASE)
+_ANSWER_LINE_RE = re.compile(
+    r"^\s*\[\s*answer\s*\d*\s*\]\s*", re.IGNORECASE | re.MULTILINE
+)
+_NEWLINES_RE = re.compile(r"\n{3,}")
+_BLANK_MARKER_RE = re.compile(r"_{3,}|\[\s*\]|\(\s*\)")
+_QA_WORD_RE = re.compile(r"\b(question|prompt|response|answer)\b", re.IGNORECASE)
+_PROMPT_LINE_RE = re.compile(r"\?|:\s*$|_{3,}|\[\s*\]")
+_PROMPT_KEYWORD_RE = re.compile(
+    r"\b(what|why|how|describe|explain|choose|list|write|source type|brief summary|your thoughts|free response|entry\s*#|title, author|topic)\b"
+)
+_PROMPT_MARKER_RE = re.compile(r"\?|:\s*$|_{3,}|\[\s*\]|\(\s*\)")
+_ENUMERATED_RE = re.compile(r"^\s*(?:\d+[.)]|[A-Z][.)]|[-*])\s+")
+_ANSWER_HINT_RE = re.compile(r"\b(type here|your answer|response|answer)\b")
+_BLOCK_MENTION_RE = re.compile(r"\bblock\s*\d", re.IGNORECASE)
+_FULL_NAME_RE = re.compile(r"\b[A-Z][a-z]+\s+[A-Z][a-z]+\b")
+_ANSWER_LABEL_TAG_RE = re.compile(r"^\s*\[\s*answer\s*\d*\s*\]\s*", re.IGNORECASE)
+_ANSWER_LABEL_RE = re.compile(
+    r"^\s*(?:answer|response)\s*\d*\s*[:.-]\s*", re.IGNORECASE
+)
+_ANSWER_MARKER_RE = re.compile(r"(?im)^\s*\[\s*answer\s*(\d+)\s*\]\s*$")
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n+")
+_LIST_SPLIT_RE = re.compile(r"\n(?=\s*(?:\d+[.)]|[-*]))")
+_TABLE_RE = re.compile(r"<table[^>]*>.*?</table>", re.DOTALL)
+_ROW_RE = re.compile(r"<tr[^>]*>(.*?)</tr>", re.DOTALL)
+_CELL_RE = re.compile(r"<td[^>]*>(.*?)</td>", re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_CHOICE_RE = re.compile(r"^[A-D]\)\s*(.+)")
+
+_SETTER_JS = """
+(el, value) => {
+    if (el instanceof HTMLTextAreaElement || el instanceof HTMLInputElement) {
+        el.focus();
+        el.value = value;
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        return true;
+    }
+    if (el.isContentEditable) {
+        el.focus();
+        el.innerText = value;
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        return true;
+    }
+    return false;
+}
+"""
+
+register_page_script(
+    f"window.__sf = Object.assign(window.__sf || {{}}, {{ setter: {_SETTER_JS} }});"
+)
+
 
 def _normalize_text(value: str) -> str:
-    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", value.lower())).strip()
+    return _WS_RE.sub(" ", _NON_ALNUM_RE.sub(" ", value.lower())).strip()
 
 
 def _titles_match(expected: str, observed: str) -> bool:
@@ -74,12 +136,12 @@ def _strip_query(url: str) -> str:
 
 
 def _extract_assignment_id(url: str) -> str:
-    match = re.search(r"/a/([^/?#]+)", url or "")
+    match = _ASSIGNMENT_ID_RE.search(url or "")
     return match.group(1) if match else ""
 
 
 def _extract_doc_id(url: str) -> str:
-    match = re.search(r"/document/d/([^/?#]+)", url or "")
+    match = _DOC_ID_RE.search(url or "")
     return match.group(1) if match else ""
 
 
@@ -108,17 +170,15 @@ def _prepare_draft_for_comment(draft_text: str) -> str:
 
 def _prepare_draft_for_doc(draft_text: str) -> str:
     text = draft_text.replace("\r\n", "\n").replace("\r", "\n").strip()
-    text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)
-    text = re.sub(r"__(.+?)__", r"\1", text)
-    text = re.sub(r"`([^`]+)`", r"\1", text)
-    text = re.sub(r"^\s*#{1,6}\s*", "", text, flags=re.MULTILINE)
-    text = re.sub(r"<\s*text\s*>", "", text, flags=re.IGNORECASE)
-    text = re.sub(r"<\s*answer\s*>", "", text, flags=re.IGNORECASE)
-    text = re.sub(r"\[\s*insert[^\]]*\]", "", text, flags=re.IGNORECASE)
-    text = re.sub(
-        r"^\s*\[\s*answer\s*\d*\s*\]\s*", "", text, flags=re.IGNORECASE | re.MULTILINE
-    )
-    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+    text = _BOLD_RE.sub(r"\1", text)
+    text = _UNDER_RE.sub(r"\1", text)
+    text = _CODE_RE.sub(r"\1", text)
+    text = _HEADING_RE.sub("", text)
+    text = _TEXT_TAG_RE.sub("", text)
+    text = _ANSWER_TAG_RE.sub("", text)
+    text = _INSERT_RE.sub("", text)
+    text = _ANSWER_LINE_RE.sub("", text)
+    text = _NEWLINES_RE.sub("\n\n", text).strip()
     if len(text) > MAX_DOC_PASTE_CHARS:
         logger.warning(
             "Draft is very long for Docs typing (%d chars). Truncating to %d chars.",
@@ -149,24 +209,7 @@ async def _fast_paste_into_editor(page: Page, editor: Locator, text: str) -> boo
         if not handle:
             return False
         ok = await handle.evaluate(
-            """
-            (el, value) => {
-                if (el instanceof HTMLTextAreaElement || el instanceof HTMLInputElement) {
-                    el.focus();
-                    el.value = value;
-                    el.dispatchEvent(new Event('input', { bubbles: true }));
-                    el.dispatchEvent(new Event('change', { bubbles: true }));
-                    return true;
-                }
-                if (el.isContentEditable) {
-                    el.focus();
-                    el.innerText = value;
-                    el.dispatchEvent(new Event('input', { bubbles: true }));
-                    return true;
-                }
-                return false;
-            }
-            """,
+            "(el, value) => window.__sf.setter(el, value)",
             text,
         )
         return bool(ok)
@@ -195,7 +238,7 @@ async def _read_assignment_heading(page: Page) -> str:
         for idx in range(min(3, count)):
             try:
                 item = loc.nth(idx)
-                if await item.is_visible(timeout=800):
+                if await item.is_visible(timeout=500):
                     text = (await item.inner_text(timeout=1000)).strip()
                     if text:
                         return text
@@ -255,6 +298,43 @@ async def _open_and_verify_assignment(
     return False
 
 
+# _find_first_visible, per page: selector ladder -> the entry that matched last
+_SELECTOR_HITS: "weakref.WeakKeyDictionary[Page, dict[tuple[str, ...], str]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _selector_scope(selector: str) -> str | None:
+    """The ancestor part of a descendant selector ('div[role="dialog"]' for
+    'div[role="dialog"] input'), or None for an unscoped selector."""
+    depth = 0
+    quote = ""
+    for idx, ch in enumerate(selector):
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == " " and depth == 0:
+            return selector[:idx]
+    return None
+
+
+def _remember_hit(page: Page, key: tuple[str, ...], selector: str) -> None:
+    # Ladders run specific -> generic, so a later entry may only jump the queue when
+    # everything above it is scoped to the same container; otherwise one slow
+    # render would make e.g. a bare 'input[type="text"]' win every later call.
+    idx = key.index(selector)
+    scope = _selector_scope(selector)
+    if idx and (scope is None or any(_selector_scope(sel) != scope for sel in key[:idx])):
+        return
+    _SELECTOR_HITS.setdefault(page, {})[key] = selector
+
+
 async def _find_first_visible(
     page: Page, selectors: list[str], timeout_ms: int, context: str = ""
 ) -> Locator | None:
@@ -262,6 +342,12 @@ async def _find_first_visible(
         return None
 
     per_selector_timeout = max(250, int(timeout_ms / len(selectors)))
+    key = tuple(selectors)
+    # Try the selector that matched last time first; the ladder order is the fallback
+    hit = _SELECTOR_HITS.get(page, {}).get(key)
+    if hit is not None and hit != selectors[0]:
+        selectors = [hit, *(sel for sel in selectors if sel != hit)]
+
     for selector in selectors:
         loc = page.locator(selector)
         try:
@@ -271,11 +357,14 @@ async def _find_first_visible(
 
         if count > 1:
             visible_count = 0
+            first_visible: Locator | None = None
             for idx in range(min(count, 8)):
                 try:
                     candidate = loc.nth(idx)
                     if await candidate.is_visible(timeout=200):
                         visible_count += 1
+                        if first_visible is None:
+                            first_visible = candidate
                 except Exception:
                     pass
             if visible_count > 1:
@@ -285,12 +374,16 @@ async def _find_first_visible(
                     visible_count,
                     context,
                 )
+            if first_visible is not None:
+                _remember_hit(page, key, selector)
+                return first_visible
 
         max_candidates = min(count, 8)
         for idx in range(max_candidates):
             try:
                 candidate = loc.nth(idx)
                 await candidate.wait_for(state="visible", timeout=per_selector_timeout)
+                _remember_hit(page, key, selector)
                 return candidate
             except Exception:
                 continue
@@ -501,7 +594,7 @@ async def _focus_doc_editor(page: Page) -> bool:
 
 def _normalize_doc_text(text: str) -> str:
     normalized = text.replace("\r\n", "\n").replace("\r", "\n")
-    normalized = re.sub(r"\n{3,}", "\n\n", normalized)
+    normalized = _NEWLINES_RE.sub("\n\n", normalized)
     return normalized.strip()
 
 
@@ -509,22 +602,18 @@ def _estimate_template_fields(doc_text: str) -> int:
     if not doc_text:
         return 0
 
-    marker_count = len(re.findall(r"_{3,}|\[\s*\]|\(\s*\)", doc_text))
+    marker_count = len(_BLANK_MARKER_RE.findall(doc_text))
     labeled_lines = sum(
         1
         for ln in doc_text.splitlines()
         if ln.strip().endswith(":") and 2 <= len(ln.strip()) <= 80
     )
-    q_count = len(
-        re.findall(
-            r"\b(question|prompt|response|answer)\b", doc_text, flags=re.IGNORECASE
-        )
-    )
+    q_count = len(_QA_WORD_RE.findall(doc_text))
     prompt_like = len(
         [
             ln
             for ln in doc_text.splitlines()
-            if re.search(r"\?|:\s*$|_{3,}|\[\s*\]", ln.strip())
+            if _PROMPT_LINE_RE.search(ln.strip())
             and 4 <= len(ln.strip()) <= 180
         ]
     )
@@ -546,18 +635,12 @@ def _is_prompt_candidate(line: str) -> bool:
         return False
 
     lower = line.lower()
-    keyword_prompt = bool(
-        re.search(
-            r"\b(what|why|how|describe|explain|choose|list|write|source type|brief summary|your thoughts|free response|entry\s*#|title, author|topic)\b",
-            lower,
-        )
-    )
+    keyword_prompt = bool(_PROMPT_KEYWORD_RE.search(lower))
     if keyword_prompt and len(line.split()) <= 26:
         return True
 
     return bool(
-        re.search(r"\?|:\s*$|_{3,}|\[\s*\]|\(\s*\)", line)
-        or re.match(r"^\s*(?:\d+[.)]|[A-Z][.)]|[-*])\s+", line)
+        _PROMPT_MARKER_RE.search(line) or _ENUMERATED_RE.match(line)
     )
 
 
@@ -566,7 +649,7 @@ def _extract_template_prompts(doc_text: str) -> list[str]:
     seen: set[str] = set()
 
     for raw in doc_text.splitlines():
-        line = re.sub(r"\s+", " ", raw).strip()
+        line = _WS_RE.sub(" ", raw).strip()
         if not _is_prompt_candidate(line):
             continue
 
@@ -583,7 +666,7 @@ def _extract_template_prompts(doc_text: str) -> list[str]:
 
 
 def _extract_fillable_prompts(doc_text: str) -> list[str]:
-    raw_lines = [re.sub(r"\s+", " ", ln).strip() for ln in doc_text.splitlines()]
+    raw_lines = [_WS_RE.sub(" ", ln).strip() for ln in doc_text.splitlines()]
     prompt_entries: list[tuple[int, str]] = []
     seen: set[str] = set()
 
@@ -614,10 +697,10 @@ def _extract_fillable_prompts(doc_text: str) -> list[str]:
 
         first = segment[0]
         first_lower = first.lower()
-        if re.search(r"_{3,}|\[\s*\]|\(\s*\)", first):
+        if _BLANK_MARKER_RE.search(first):
             fillable.append(prompt)
             continue
-        if re.search(r"\b(type here|your answer|response|answer)\b", first_lower):
+        if _ANSWER_HINT_RE.search(first_lower):
             fillable.append(prompt)
             continue
         if first.startswith("(") and first.endswith(")"):
@@ -638,8 +721,8 @@ def _looks_like_shared_class_table(doc_text: str) -> bool:
     tab_lines = sum(1 for ln in lines if "\t" in ln)
     if tab_lines < 5:
         return False
-    block_mentions = len(re.findall(r"\bblock\s*\d", doc_text, flags=re.IGNORECASE))
-    name_like = len(re.findall(r"\b[A-Z][a-z]+\s+[A-Z][a-z]+\b", doc_text))
+    block_mentions = len(_BLOCK_MENTION_RE.findall(doc_text))
+    name_like = len(_FULL_NAME_RE.findall(doc_text))
     return block_mentions >= 4 or name_like >= 8
 
 
@@ -662,10 +745,8 @@ def _looks_like_template(doc_text: str) -> bool:
 
 def _strip_answer_label(text: str) -> str:
     out = text.strip()
-    out = re.sub(r"^\s*\[\s*answer\s*\d*\s*\]\s*", "", out, flags=re.IGNORECASE)
-    out = re.sub(
-        r"^\s*(?:answer|response)\s*\d*\s*[:.-]\s*", "", out, flags=re.IGNORECASE
-    )
+    out = _ANSWER_LABEL_TAG_RE.sub("", out)
+    out = _ANSWER_LABEL_RE.sub("", out)
     return out.strip()
 
 
@@ -673,7 +754,7 @@ def _split_template_answers(text: str, max_fields: int) -> list[str]:
     if not text.strip():
         return []
 
-    marker_matches = list(re.finditer(r"(?im)^\s*\[\s*answer\s*(\d+)\s*\]\s*$", text))
+    marker_matches = list(_ANSWER_MARKER_RE.finditer(text))
     if marker_matches:
         pieces: list[str] = []
         for i, match in enumerate(marker_matches):
@@ -692,13 +773,13 @@ def _split_template_answers(text: str, max_fields: int) -> list[str]:
             blocks = [text.strip()]
     else:
         blocks = [
-            chunk.strip() for chunk in re.split(r"\n\s*\n+", text) if chunk.strip()
+            chunk.strip() for chunk in _PARAGRAPH_SPLIT_RE.split(text) if chunk.strip()
         ]
 
     if len(blocks) <= 1 and max_fields > 1:
         blocks = [
             chunk.strip()
-            for chunk in re.split(r"\n(?=\s*(?:\d+[.)]|[-*]))", text)
+            for chunk in _LIST_SPLIT_RE.split(text)
             if chunk.strip()
         ]
 
@@ -803,7 +884,7 @@ async def _jump_to_marker(page: Page, marker: str) -> bool:
     try:
         await page.keyboard.press(f"{MOD_KEY}+A")
         await asyncio.sleep(0.06)
-        await page.keyboard.type(marker, delay=25)
+        await page.keyboard.insert_text(marker)
         await asyncio.sleep(0.15)
         await page.keyboard.press("Enter")
         await asyncio.sleep(0.2)
@@ -851,24 +932,22 @@ async def _detect_doc_table_layout(page: Page, doc_id: str) -> _DocTableInfo:
             return result
         html = await resp.text()
         await resp.dispose()
-        import re as _re
-
-        tables = _re.findall(r"<table[^>]*>.*?</table>", html, _re.DOTALL)
+        tables = _TABLE_RE.findall(html)
         if not tables:
             return result
 
         for table_html in tables:
-            rows = _re.findall(r"<tr[^>]*>(.*?)</tr>", table_html, _re.DOTALL)
+            rows = _ROW_RE.findall(table_html)
             if len(rows) < 2:
                 continue
 
             # Check for side-by-side layout: prompt in left cell, empty right cell
             side_rows = 0
             for row in rows:
-                cells = _re.findall(r"<td[^>]*>(.*?)</td>", row, _re.DOTALL)
+                cells = _CELL_RE.findall(row)
                 if len(cells) == 2:
-                    left = _re.sub(r"<[^>]+>", "", cells[0]).strip()
-                    right = _re.sub(r"<[^>]+>", "", cells[1]).strip()
+                    left = _TAG_RE.sub("", cells[0]).strip()
+                    right = _TAG_RE.sub("", cells[1]).strip()
                     if left and not right:
                         side_rows += 1
             if side_rows >= 2:
@@ -879,15 +958,13 @@ async def _detect_doc_table_layout(page: Page, doc_id: str) -> _DocTableInfo:
             # Check for stacked layout: prompt row then empty answer row (single-column or wide cell)
             below_pairs = 0
             for i in range(len(rows) - 1):
-                cells_this = _re.findall(r"<td[^>]*>(.*?)</td>", rows[i], _re.DOTALL)
-                cells_next = _re.findall(
-                    r"<td[^>]*>(.*?)</td>", rows[i + 1], _re.DOTALL
-                )
+                cells_this = _CELL_RE.findall(rows[i])
+                cells_next = _CELL_RE.findall(rows[i + 1])
                 this_text = " ".join(
-                    _re.sub(r"<[^>]+>", "", c).strip() for c in cells_this
+                    _TAG_RE.sub("", c).strip() for c in cells_this
                 )
                 next_text = " ".join(
-                    _re.sub(r"<[^>]+>", "", c).strip() for c in cells_next
+                    _TAG_RE.sub("", c).strip() for c in cells_next
                 )
                 if this_text and not next_text:
                     below_pairs += 1
@@ -904,7 +981,7 @@ async def _detect_doc_table_layout(page: Page, doc_id: str) -> _DocTableInfo:
 async def _type_answer_into_adjacent_cell(page: Page, prompt: str, answer: str) -> bool:
     """For table-layout docs (side): Find the prompt, then Tab into the adjacent answer cell.
     NEVER deletes existing content -- only types into the cell."""
-    prompt_query = re.sub(r"\s+", " ", prompt).strip()
+    prompt_query = _WS_RE.sub(" ", prompt).strip()
     if len(prompt_query) > 90:
         prompt_query = prompt_query[:90]
     if not prompt_query:
@@ -931,7 +1008,7 @@ async def _type_answer_into_adjacent_cell(page: Page, prompt: str, answer: str)
 
 async def _type_answer_into_cell_below(page: Page, prompt: str, answer: str) -> bool:
     """For table-layout docs (below): Find the prompt, then move down into the answer cell beneath."""
-    prompt_query = re.sub(r"\s+", " ", prompt).strip()
+    prompt_query = _WS_RE.sub(" ", prompt).strip()
     if len(prompt_query) > 90:
         prompt_query = prompt_query[:90]
     if not prompt_query:
@@ -961,7 +1038,7 @@ async def _type_answer_into_cell_below(page: Page, prompt: str, answer: str) ->
 async def _type_answer_under_prompt(page: Page, prompt: str, answer: str) -> bool:
     """For non-table docs: Find the prompt, move to the empty area below it, then type.
     NEVER deletes existing content -- only adds text where the cursor lands."""
-    prompt_query = re.sub(r"\s+", " ", prompt).strip()
+    prompt_query = _WS_RE.sub(" ", prompt).strip()
     if len(prompt_query) > 90:
         prompt_query = prompt_query[:90]
 
@@ -994,7 +1071,7 @@ async def _type_answer_under_prompt(page: Page, prompt: str, answer: str) -> boo
 
 async def _fill_blank_on_line(page: Page, prompt: str, answer: str) -> bool:
     """For fill-in-the-blank: find the underscores near the prompt and replace with the answer word."""
-    prompt_query = re.sub(r"\s+", " ", prompt).strip()
+    prompt_query = _WS_RE.sub(" ", prompt).strip()
     if len(prompt_query) > 90:
         prompt_query = prompt_query[:90]
     if not prompt_query:
@@ -1026,11 +1103,11 @@ async def _fill_blank_on_line(page: Page, prompt: str, answer: str) -> bool:
         await page.keyboard.press(f"{MOD_KEY}+h")
         await asyncio.sleep(0.3)
         # Type underscores pattern in find field
-        await page.keyboard.type("______", delay=20)
+        await page.keyboard.insert_text("______")
         await asyncio.sleep(0.15)
         await page.keyboard.press("Tab")
         await asyncio.sleep(0.1)
-        await page.keyboard.type(answer, delay=25)
+        await page.keyboard.insert_text(answer)
         await asyncio.sleep(0.15)
         # Replace just this one
         # Look for replace button
@@ -1046,7 +1123,7 @@ async def _fill_blank_on_line(page: Page, prompt: str, answer: str) -> bool:
     # Fallback: just go to end of line and type
     await page.keyboard.press("End")
     await asyncio.sleep(0.08)
-    await page.keyboard.type(f" {answer}", delay=30)
+    await page.keyboard.insert_text(f" {answer}")
     await asyncio.sleep(0.2)
     return True
 
@@ -1061,7 +1138,7 @@ async def _highlight_mc_answer(page: Page, prompt: str, answer: str) -> bool:
     found = await _jump_to_marker(page, choice_text)
     if not found:
         # Try with just the answer part after the letter
-        parts = re.match(r"^[A-D]\)\s*(.+)", choice_text)
+        parts = _CHOICE_RE.match(choice_text)
         if parts:
             found = await _jump_to_marker(page, parts.group(1).strip())
 
@@ -1080,7 +1157,7 @@ async def _highlight_mc_answer(page: Page, prompt: str, answer: str) -> bool:
     await asyncio.sleep(0.2)
     await page.keyboard.press(f"{MOD_KEY}+A")
     await asyncio.sleep(0.05)
-    await page.keyboard.type(choice_text, delay=20)
+    await page.keyboard.insert_text(choice_text)
     await asyncio.sleep(0.15)
     await page.keyboard.press("Enter")
     await asyncio.sleep(0.2)
@@ -1136,7 +1213,7 @@ async def _fill_template_fields(
     attachment_summary = summarize_attachment_context(
         assignment.attachment_urls, material_texts
     )
-    answers = generate_structured_answers(
+    answers = await generate_structured_answers_async(
         assignment=assignment,
         style_examples=style_examples,
         material_texts=material_texts,
@@ -1606,7 +1683,7 @@ async def _deliver_via_ap_classroom(
             return False
 
         try:
-            detected = await _extract_editable_fields(ap_page)
+            detected, questions = await _extract_all(ap_page)
         except Exception as exc:
             logger.info("  Paste: AP Classroom field detection unavailable: %s", exc)
             continue
@@ -1615,12 +1692,6 @@ async def _deliver_via_ap_classroom(
             logger.info("  Paste: no fillable AP Classroom fields found on link")
             continue
 
-        questions = []
-        try:
-            questions = await _extract_questions_from_page(ap_page)
-        except Exception:
-            pass
-
         question_snippets = (
             [q.snippet for q in questions]
             if questions
@@ -1630,7 +1701,7 @@ async def _deliver_via_ap_classroom(
             assignment.attachment_urls + [ap_url],
             material_texts,
         )
-        answers = generate_structured_answers(
+        answers = await generate_structured_answers_async(
             assignment=assignment,
             style_examples=style_examples,
             material_texts=material_texts,
@@ -1638,7 +1709,7 @@ async def _deliver_via_ap_classroom(
             attachment_summary=attachment_summary,
         )
 
-        debug_dir = str(settings.project_root)
+        debug_dir = str(settings.project_root) if settings.debug else None
         try:
             result: SmartFillResult = await smart_fill_fields(
                 ap_page, answers, debug_dir=debug_dir
@@ -1768,7 +1839,7 @@ async def _deliver_via_ap_classroom_linked(
             assignment.attachment_urls + [ap_url],
             material_texts,
         )
-        answers = generate_structured_answers(
+        answers = await generate_structured_answers_async(
             assignment=assignment,
             style_examples=style_examples,
             material_texts=material_texts,
@@ -1777,7 +1848,7 @@ async def _deliver_via_ap_classroom_linked(
         )
 
         # Fill AP response fields
-        debug_dir = str(settings.project_root)
+        debug_dir = str(settings.project_root) if settings.debug else None
         try:
             result: SmartFillResult = await smart_fill_fields(
                 page, answers, debug_dir=debug_dir
@@ -1979,7 +2050,7 @@ async def _deliver_via_assignment_fields(
 ) -> bool:
     # Use the new smart_fill_fields flow: scroll, extract, LLM, fill per-field
     try:
-        detected = await _extract_editable_fields(page)
+        detected, questions = await _extract_all(page)
     except Exception as exc:
         logger.info("  Paste: assignment field detection unavailable: %s", exc)
         return False
@@ -1987,12 +2058,6 @@ async def _deliver_via_assignment_fields(
     if not detected:
         return False
 
-    questions = []
-    try:
-        questions = await _extract_questions_from_page(page)
-    except Exception:
-        pass
-
     question_snippets = (
         [q.snippet for q in questions]
         if questions
@@ -2001,7 +2066,7 @@ async def _deliver_via_assignment_fields(
     attachment_summary = summarize_attachment_context(
         assignment.attachment_urls, material_texts
     )
-    answers = generate_structured_answers(
+    answers = await generate_structured_answers_async(
         assignment=assignment,
         style_examples=style_examples,
         material_texts=material_texts,
@@ -2016,7 +2081,7 @@ async def _deliver_via_assignment_fields(
         len(answers),
     )
 
-    debug_dir = str(settings.project_root)
+    debug_dir = str(settings.project_root) if settings.debug else None
     try:
         result: SmartFillResult = await smart_fill_fields(
             page, answers, debug_dir=debug_dir
@@ -2182,62 +2247,3 @@ async def paste_draft(
         assignment.delivery_method = "failed"
         assignment.delivery_details = "exception"
         return False
-
-    logger.info("  Paste: acquiring shared tab")
-    page = await get_page()
-    apply_default_timeouts(page)
-    logger.info("  Paste: shared tab ready")
-    doc_text = _prepare_draft_for_doc(draft_text)
-    style_examples = style_examples or []
-    material_texts = material_texts or []
-
-    try:
-        logger.info("  Paste: opening assignment page")
-        if not await _open_and_verify_assignment(
-            page, assignment, mark_skip_on_fail=True
-        ):
-            return False
-
-        try:
-            await page.wait_for_load_state("networkidle", timeout=45000)
-        except Exception:
-            pass
-
-        delivered_via_fields = await _deliver_via_assignment_fields(
-            page=page,
-            assignment=assignment,
-            style_examples=style_examples,
-            material_texts=material_texts,
-        )
-        if delivered_via_fields:
-            return True
-
-        delivered_via_doc = await _deliver_via_google_doc(
-            page=page,
-            assignment=assignment,
-            text=doc_text,
-            style_examples=style_examples,
-            material_texts=material_texts,
-        )
-        if delivered_via_doc:
-            return True
-
-        delivered_via_ap = await _deliver_via_ap_classroom(
-            page=page,
-            assignment=assignment,
-            style_examples=style_examples,
-            material_texts=material_texts,
-        )
-        if delivered_via_ap:
-            return True
-
-        assignment.delivery_method = "failed"
-        assignment.delivery_details = "doc_and_ap_delivery_failed"
-        logger.warning("Google Doc/AP delivery failed for: %s", assignment.title)
-        return False
-
-    except Exception:
-        logger.exception("Paste failed for: %s", assignment.title)
-        assignment.delivery_method = "failed"
-        assignment.delivery_details = "exception"
-        return False
@@ -1,58 +1,64 @@
 import asyncio
 import logging
+import random
 import re
+import time
 from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
 
 from playwright.async_api import Page
 
-from browser.session import get_page, check_logged_in, safe_goto
+from browser.session import (
+    acquire_page,
+    get_page,
+    check_logged_in,
+    register_page_script,
+    release_page,
+    safe_goto,
+)
+from classroom import cache as enrich_cache
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-IGNORE_KEYWORDS: list[str] = []
-IGNORE_ASSIGN_KEYWORDS: list[str] = []
 
+def _keyword_regex(keywords: list[str], whole_word: bool = False) -> re.Pattern | None:
+    if not keywords:
+        return None
+    alternation = "|".join(re.escape(kw) for kw in keywords)
+    if whole_word:
+        alternation = rf"\b(?:{alternation})\b"
+    return re.compile(alternation)
 
+
+IGNORE_KEYWORDS: list[str] = sorted(settings.ignore_courses_set)
+IGNORE_ASSIGN_KEYWORDS: list[str] = sorted(settings.ignore_assignments_set)
+# Courses match anywhere in "title course"; assignment keywords as whole words
+_IGNORE_COURSE_RE = _keyword_regex(IGNORE_KEYWORDS)
+_IGNORE_ASSIGN_RE = _keyword_regex(IGNORE_ASSIGN_KEYWORDS, whole_word=True)
+
+
+_ID_RE = re.compile(r"/c/([^/]+)/a/([^/?#]+)")
+
+
+@lru_cache(maxsize=4096)
 def _extract_ids_from_url(url: str) -> tuple[str, str]:
     if not url:
         return "", ""
-    match = re.search(r"/c/([^/]+)/a/([^/?#]+)", url)
+    match = _ID_RE.search(url)
     if not match:
         return "", ""
     return match.group(1), match.group(2)
 
 
-def _load_ignore_list() -> list[str]:
-    global IGNORE_KEYWORDS
-    if not IGNORE_KEYWORDS:
-        raw = settings.ignore_courses
-        IGNORE_KEYWORDS = [k.strip().lower() for k in raw.split(",") if k.strip()]
-    return IGNORE_KEYWORDS
-
-
-def _load_ignore_assign_list() -> list[str]:
-    global IGNORE_ASSIGN_KEYWORDS
-    if not IGNORE_ASSIGN_KEYWORDS:
-        raw = getattr(settings, "ignore_assignments", "")
-        IGNORE_ASSIGN_KEYWORDS = [
-            k.strip().lower() for k in raw.split(",") if k.strip()
-        ]
-    return IGNORE_ASSIGN_KEYWORDS
-
-
 def _should_skip(title: str, class_name: str) -> bool:
-    course_kws = _load_ignore_list()
-    combined = f"{title} {class_name}".lower()
-    if any(kw in combined for kw in course_kws):
-        return True
-    assign_kws = _load_ignore_assign_list()
     title_lower = title.lower()
-    for kw in assign_kws:
-        if re.search(r"\b" + re.escape(kw) + r"\b", title_lower):
-            return True
-    return False
+    if _IGNORE_COURSE_RE and _IGNORE_COURSE_RE.search(f"{title_lower} {class_name.lower()}"):
+        return True
+    return bool(_IGNORE_ASSIGN_RE and _IGNORE_ASSIGN_RE.search(title_lower))
 
 
 SUBMISSION_TYPE_TYPED = "typed_response"
@@ -64,8 +70,21 @@ SUBMISSION_TYPE_UNKNOWN = "unknown"
 
 AP_LINK_PATTERN = r"(collegeboard\.org|myap|apclassroom)"
 
+TODO_URL = "https://classroom.google.com/u/0/a/not-turned-in/all"
+ASSIGNMENT_LINK_SELECTOR = 'a[href*="/c/"][href*="/a/"]'
+ASSIGNMENT_HEADING_SELECTOR = '[role="main"] h1, div[role="heading"][aria-level="1"]'
+TODO_SECTION_LABELS = ["This week", "Last week", "Earlier", "Next week", "Later"]
+
+# Cheap fingerprint of the rendered to-do list, used to detect a tab switch
+_TODO_SIGNATURE_JS = """
+(sel) => {
+    const links = document.querySelectorAll(sel);
+    return links.length + '|' + Array.from(links, a => a.href).slice(0, 5).join('|');
+}
+"""
 
-@dataclass
+
+@dataclass(slots=True)
 class Assignment:
     course_name: str
     title: str
@@ -81,253 +100,356 @@ class Assignment:
     submission_type: str = ""
 
 
-async def _save_debug(page: Page, name: str) -> None:
+_TODO_SCRAPE_JS = """
+() => {
+    const byUrl = new Map();
+    const allLinks = document.querySelectorAll('a[href*="/c/"][href*="/a/"]');
+
+    for (const a of allLinks) {
+        const href = a.origin + a.pathname;
+        // A card can hold several links, and the same assignment can appear
+        // under /u/0/, /u/1/ etc.; key on /c/X/a/Y and keep the first link
+        // whose card yields a class name
+        const canonical = a.pathname.replace(/\\/u\\/\\d+/, '');
+        const prev = byUrl.get(canonical);
+        if (prev && prev.class_name) continue;
+
+        const container = a.closest('li') || a.closest('[role="listitem"]') || a;
+        const fullText = container.textContent || '';
+
+        // Title: first meaningful text in the link
+        let title = '';
+        const walker = document.createTreeWalker(a, NodeFilter.SHOW_TEXT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            const t = node.nodeValue.trim();
+            if (t.length > 3 && t.length < 200 &&
+                !SKIP_TITLE_RE.test(t) && !SKIP_TITLE_CI_RE.test(t)) {
+                title = t;
+                break;
+            }
+        }
+        if (!title) title = a.textContent.trim().split('\\n')[0].substring(0, 150);
+        if (!title || title.length < 2) continue;
+
+        // Class name: typically the line right under the title
+        const lines = (container.innerText || '').split('\\n').map(l => l.trim()).filter(Boolean);
+        const titleIdx = lines.indexOf(title);
+        const className = titleIdx < 0 ? '' : (lines.slice(titleIdx + 1).find(l =>
+            l.length > 2 && l.length < 100 &&
+            !SKIP_CLASS_RE.test(l) && !WEEKDAY_RE.test(l)
+        ) || '');
+
+        // Due text
+        let dueText = '';
+        const dateMatch = fullText.match(DUE_RE);
+        if (dateMatch) dueText = dateMatch[0].trim();
+
+        if (prev && !className) continue;
+        // Omit empty fields to keep the payload small
+        const item = { title: title, url: href };
+        if (dueText) item.due_text = dueText;
+        if (className) item.class_name = className;
+        byUrl.set(canonical, item);
+    }
+    return [...byUrl.values()];
+}
+"""
+
+_ENRICH_JS = """
+() => {
+    // Assignment title
+    let assignmentTitle = '';
+    for (const sel of ['h1', '[role="main"] h1', 'div[role="heading"][aria-level="1"]']) {
+        const el = document.querySelector(sel);
+        if (!el) continue;
+        const t = (el.textContent || '').trim();
+        if (t.length > 1 && t.length < 250) {
+            assignmentTitle = t;
+            break;
+        }
+    }
+
+    if (!assignmentTitle || /^classroom/i.test(assignmentTitle)) {
+        const fromTitle = (document.title || '').replace(/\\s*-\\s*Google Classroom.*$/i, '').trim();
+        if (fromTitle && !CLASSROOM_RE.test(fromTitle)) {
+            assignmentTitle = fromTitle;
+        }
+    }
+
+    // Description
+    let desc = '';
+    for (const sel of ['[class*="z3vRcc"]', '[dir="ltr"]', '[role="main"] div']) {
+        for (const el of document.querySelectorAll(sel)) {
+            const t = el.textContent.trim();
+            if (t.length > 20 && t.length > desc.length && t.length < 5000) desc = t;
+        }
+        if (desc.length > 20) break;
+    }
+
+    // Course name from breadcrumb at top of page
+    let courseName = '';
+    // The breadcrumb shows "Classroom > CourseName" at the top
+    const breadcrumb = document.querySelector('header a[href*="/c/"]');
+    if (breadcrumb) {
+        courseName = breadcrumb.textContent.trim();
+    }
+    if (CLASSROOM_RE.test(courseName)) {
+        courseName = '';
+    }
+    if (!courseName) {
+        for (const b of document.querySelectorAll('[class*="onkcGd"], [class*="uDEFge"]')) {
+            const t = b.textContent.trim();
+            if (t.length > 2 && t.length < 100 && !CLASSROOM_RE.test(t)) { courseName = t; break; }
+        }
+    }
+
+    // Attachments
+    const attachments = new Set();
+    for (const l of document.querySelectorAll(
+        'a[href*="drive.google.com"], a[href*="docs.google.com"], ' +
+        'a[href*="youtube.com"], a[href*="forms.google.com"], ' +
+        'a[href*="collegeboard.org"], a[href*="myap"], a[href*="apclassroom"]'
+    )) attachments.add(l.href);
+    const attachmentList = Array.from(attachments);
+
+    // Detect submission type
+    // Priority: AP Classroom LINK > AP on-page > Google Doc > Typed Response > File Upload > Unknown
+    let submissionType = 'unknown';
+    const pageText = (document.body?.innerText || '').toLowerCase();
+    const pageHtml = document.body?.outerHTML || '';
+
+    // Check for outbound AP Classroom links (distinct from AP questions on-page)
+    const hasAPLink = attachmentList.some(a =>
+        a.includes('collegeboard.org') || a.includes('myap') || a.includes('apclassroom')
+    );
+    if (hasAPLink) {
+        // This is an assignment with an outbound link to AP Classroom
+        submissionType = 'AP_CLASSROOM_LINKED';
+    } else {
+        // Check for AP Classroom questions ON the page (not links)
+        const hasAPOnPage = pageText.includes('ap classroom') || 
+                           pageText.includes('my ap') ||
+                           pageHtml.includes('collegeboard.org');
+
+        // Check for Google Doc attachment (template to edit)
+        // Look for "Attach" button with Google Docs option, or linked doc templates
+        const hasGoogleDocAttach = pageHtml.includes('docs.google.com/document/d/') || 
+                                   pageText.includes('attach a document') ||
+                                   pageText.includes('google doc');
+
+        // Check for typed response field
+        const hasTypedResponse = pageText.includes('your response') || 
+                                 pageText.includes('enter your response') ||
+                                 pageText.includes('type your response') ||
+                                 document.querySelector('textarea[placeholder*="response" i]') ||
+                                 document.querySelector('textarea[aria-label*="response" i]') ||
+                                 document.querySelector('div[contenteditable="true"]');
+
+        // Check for file upload
+        const hasFileUpload = pageText.includes('upload a file') || 
+                              pageText.includes('attach file') ||
+                              document.querySelector('input[type="file"]');
+
+        if (hasAPOnPage) {
+            submissionType = 'ap_classroom';
+        } else if (hasGoogleDocAttach) {
+            submissionType = 'google_doc';
+        } else if (hasTypedResponse) {
+            submissionType = 'typed_response';
+        } else if (hasFileUpload) {
+            submissionType = 'file_upload';
+        }
+    }
+
+    return {
+        ready: pageText.length >= 100,
+        title: assignmentTitle,
+        description: desc.substring(0, 2000),
+        attachments: attachmentList,
+        course_name: courseName,
+        submission_type: submissionType
+    };
+}
+"""
+
+# Click every visible collapsed-section header whose text is one of labels
+_EXPAND_SECTIONS_JS = """
+(labels) => {
+    const wanted = new Set(labels);
+    const targets = [];
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node && wanted.size; node = walker.nextNode()) {
+        const t = node.nodeValue.trim();
+        if (!wanted.has(t)) continue;
+        const el = node.parentElement;
+        if (el && el.getClientRects().length) {
+            targets.push(el);
+            wanted.delete(t);
+        }
+    }
+    for (const el of targets) el.click();
+    return targets.length;
+}
+"""
+
+# Patterns shared by the extractors above; compiled once per document
+_SHARED_PATTERNS_JS = """
+const DUE_RE = /(Due|Missing|Posted).{0,30}/i;
+// Date/section labels that are never an assignment title
+const SKIP_TITLE_RE = /^(?:Posted|Due|\\d{1,2}:\\d{2})/;
+const SKIP_TITLE_CI_RE = /^(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun|(?:This|Last|Next)\\s+(?:week|month)|Earlier|January|February|March|April|May|June|July|August|September|October|November|December)/i;
+const SKIP_CLASS_RE = /^(?:Posted|Due)/;
+const WEEKDAY_RE = /^(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)/i;
+const CLASSROOM_RE = /^classroom$/i;
+"""
+
+# Memoize the to-do scrape until the list DOM changes (expanders, tab switches)
+_SCRAPE_MEMO_JS = """
+let scrapeCache = null;
+let scrapeObserver = null;
+const scrape = () => {
+    if (scrapeCache) return scrapeCache;
+    scrapeCache = scrapeTodo();
+    if (!scrapeObserver && document.body) {
+        scrapeObserver = new MutationObserver(() => { scrapeCache = null; });
+        scrapeObserver.observe(document.body, {
+            subtree: true, childList: true, characterData: true,
+            attributes: true, attributeFilter: ['href']
+        });
+    }
+    return scrapeCache;
+};
+"""
+
+_PAGE_SCRIPT_JS = (
+    "(() => {"
+    f"{_SHARED_PATTERNS_JS}"
+    f"const scrapeTodo = {_TODO_SCRAPE_JS};"
+    f"{_SCRAPE_MEMO_JS}"
+    f"window.__sf = Object.assign(window.__sf || {{}}, "
+    f"{{ scrape, enrich: {_ENRICH_JS}, expand: {_EXPAND_SECTIONS_JS} }});"
+    "})();"
+)
+register_page_script(_PAGE_SCRIPT_JS)
+
+
+async def _call_page_script(page: Page, name: str, arg: object = None) -> Any:
+    """Call a window.__sf scanner function, defining it first if the page lacks it.
+
+    The init script only reaches contexts launched after this module was imported.
+    """
+    result = await page.evaluate(
+        f"(arg) => typeof window.__sf?.{name} === 'function'"
+        f" ? {{ defined: true, value: window.__sf.{name}(arg) }} : {{ defined: false }}",
+        arg,
+    )
+    if result["defined"]:
+        return result["value"]
+    await page.evaluate(_PAGE_SCRIPT_JS)
+    return await page.evaluate(f"(arg) => window.__sf.{name}(arg)", arg)
+
+
+_pending_screenshots: set[asyncio.Task] = set()
+
+
+async def _screenshot_quietly(page: Page, path: Path) -> None:
     try:
-        safe_name = "".join(c if c.isalnum() or c in " _-" else "_" for c in name)[:40]
-        path = settings.project_root / f"debug_{safe_name}.png"
         await page.screenshot(path=str(path), full_page=True)
         logger.info("Debug screenshot: %s", path)
     except Exception:
         pass
 
 
-async def _scan_todo_tab(page: Page, tab_label: str) -> list[dict]:
-    """Scan a specific Classroom To-do tab (Assigned/Missing)."""
-    # Go to to-do page
-    await safe_goto(
-        page,
-        "https://classroom.google.com/u/0/a/not-turned-in/all",
-        wait_selector='a[href*="/c/"]',
-    )
-    await asyncio.sleep(3)
+async def _save_debug(page: Page, name: str) -> None:
+    """Capture a debug screenshot in the background when settings.debug is on."""
+    if not settings.debug:
+        return
+    safe_name = "".join(c if c.isalnum() or c in " _-" else "_" for c in name)[:40]
+    path = settings.project_root / f"debug_{safe_name}.png"
+    task = asyncio.create_task(_screenshot_quietly(page, path))
+    _pending_screenshots.add(task)
+    task.add_done_callback(_pending_screenshots.discard)
+
 
-    # Click selected tab
+async def _wait_for_list_change(page: Page, before: str, timeout_ms: int) -> None:
+    try:
+        await page.wait_for_function(
+            f"([sel, before]) => ({_TODO_SIGNATURE_JS})(sel) !== before",
+            arg=[ASSIGNMENT_LINK_SELECTOR, before],
+            timeout=timeout_ms,
+        )
+    except Exception:
+        pass
+
+
+async def _scan_todo_tab(page: Page, tab_label: str, navigate: bool = True) -> list[dict]:
+    """Scan a specific Classroom To-do tab (Assigned/Missing).
+
+    Pass navigate=False to switch tabs on the already-open to-do page.
+    """
+    if navigate:
+        await safe_goto(page, TODO_URL, wait_selector=ASSIGNMENT_LINK_SELECTOR)
+
+    # Click selected tab, then wait for the list to re-render
     try:
         tab = page.locator(
             f'a:has-text("{tab_label}"), [role="tab"]:has-text("{tab_label}")'
-        ).first
-        if await tab.is_visible(timeout=5000):
-            await tab.click()
-            await asyncio.sleep(3)
+        )
+        if await tab.count():
+            before = await page.evaluate(_TODO_SIGNATURE_JS, ASSIGNMENT_LINK_SELECTOR)
+            await tab.first.click()
             logger.info("Clicked %s tab", tab_label)
+            await _wait_for_list_change(page, before, timeout_ms=3000)
     except Exception:
         logger.warning("Could not click %s tab", tab_label)
 
-    # Expand all collapsed sections
-    for label in ["This week", "Last week", "Earlier", "Next week", "Later"]:
-        try:
-            section = page.locator(f'text="{label}"').first
-            if await section.is_visible(timeout=1500):
-                await section.click()
-                await asyncio.sleep(1.5)
-        except Exception:
-            pass
+    # Expand all collapsed sections in one DOM pass
+    try:
+        before = await page.evaluate(_TODO_SIGNATURE_JS, ASSIGNMENT_LINK_SELECTOR)
+        expanded = await _call_page_script(page, "expand", TODO_SECTION_LABELS)
+        if expanded:
+            await _wait_for_list_change(page, before, timeout_ms=1500)
+    except Exception:
+        pass
 
     await _save_debug(page, f"todo_tab_{tab_label.lower()}")
 
-    items = await page.evaluate("""
-        () => {
-            const results = [];
-            const seen = new Set();
-            const allLinks = document.querySelectorAll('a[href*="/c/"][href*="/a/"]');
-
-            for (const a of allLinks) {
-                const href = (a.href || '').split('?')[0];
-                if (seen.has(href)) continue;
-                seen.add(href);
-
-                const container = a.closest('li') || a.closest('[role="listitem"]') || a;
-                const fullText = container.textContent || '';
-
-                // Title: first meaningful text in the link
-                let title = '';
-                for (const s of a.querySelectorAll('div, span, p')) {
-                    const t = s.textContent.trim();
-                    if (t.length > 3 && t.length < 200 &&
-                        !t.match(/^Posted/) && !t.match(/^Due/) &&
-                        !t.match(/^(Mon|Tue|Wed|Thu|Fri|Sat|Sun)/i) &&
-                        !t.match(/^\\d{1,2}:\\d{2}/) &&
-                        !t.match(/^(This|Last|Next)\\s+(week|month)/i) &&
-                        !t.match(/^Earlier/i) &&
-                        !t.match(/^(January|February|March|April|May|June|July|August|September|October|November|December)/i) &&
-                        !t.match(/^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)/i)) {
-                        title = t;
-                        break;
-                    }
-                }
-                if (!title) title = a.textContent.trim().split('\\n')[0].substring(0, 150);
-                if (!title || title.length < 2) continue;
-
-                // Class name: typically the second line under the title
-                let className = '';
-                let foundTitle = false;
-                for (const s of container.querySelectorAll('div, span')) {
-                    const t = s.textContent.trim();
-                    if (t === title) { foundTitle = true; continue; }
-                    if (foundTitle && t.length > 2 && t.length < 100 &&
-                        !t.match(/^Posted/) && !t.match(/^Due/) &&
-                        !t.match(/^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)/i)) {
-                        className = t;
-                        break;
-                    }
-                }
-
-                // Due text
-                let dueText = '';
-                const dateMatch = fullText.match(/(Due|Missing|Posted).{0,60}/i);
-                if (dateMatch) dueText = dateMatch[0].trim();
-
-                results.push({
-                    title: title,
-                    url: href,
-                    due_text: dueText,
-                    class_name: className
-                });
-            }
-            return results;
-        }
-    """)
+    items = await _call_page_script(page, "scrape")
 
     logger.info("%s tab: found %d raw items", tab_label, len(items))
     return items
 
 
 async def _enrich_assignment(page: Page, assignment: Assignment) -> None:
-    """Navigate to assignment detail page for description + attachments."""
+    """Navigate to assignment detail page for description + attachments.
+
+    Runs on the caller's already-open page; never acquires a page itself.
+    """
     if not assignment.assignment_url:
         return
 
     try:
-        await safe_goto(page, assignment.assignment_url, wait_selector='[role="main"]')
-        await asyncio.sleep(2)
-
-        # Check if page rendered - if blank, reload once
-        body_len = await page.evaluate("() => document.body?.innerText?.length || 0")
-        if body_len < 100:
-            logger.info("  Page looks blank (%d chars), reloading...", body_len)
+        await safe_goto(
+            page,
+            assignment.assignment_url,
+            wait_selector=ASSIGNMENT_HEADING_SELECTOR,
+            referer=TODO_URL,
+        )
+
+        info = await _call_page_script(page, "enrich")
+
+        # If the page rendered blank, reload once and read it again
+        if not info.get("ready"):
+            logger.info("  Page looks blank, reloading...")
             try:
                 await page.reload(wait_until="domcontentloaded", timeout=30000)
+                await page.wait_for_selector(ASSIGNMENT_HEADING_SELECTOR, timeout=15000)
             except Exception:
                 pass
-            await asyncio.sleep(5)
+            info = await _call_page_script(page, "enrich")
 
         await _save_debug(page, f"assign_{assignment.title}")
 
-        info = await page.evaluate("""
-            () => {
-                // Assignment title
-                let assignmentTitle = '';
-                for (const sel of ['h1', '[role="main"] h1', 'div[role="heading"][aria-level="1"]']) {
-                    const el = document.querySelector(sel);
-                    if (!el) continue;
-                    const t = (el.textContent || '').trim();
-                    if (t.length > 1 && t.length < 250) {
-                        assignmentTitle = t;
-                        break;
-                    }
-                }
-
-                if (!assignmentTitle || /^classroom/i.test(assignmentTitle)) {
-                    const fromTitle = (document.title || '').replace(/\\s*-\\s*Google Classroom.*$/i, '').trim();
-                    if (fromTitle && !/^classroom$/i.test(fromTitle)) {
-                        assignmentTitle = fromTitle;
-                    }
-                }
-
-                // Description
-                let desc = '';
-                for (const sel of ['[class*="z3vRcc"]', '[dir="ltr"]', '[role="main"] div']) {
-                    for (const el of document.querySelectorAll(sel)) {
-                        const t = el.textContent.trim();
-                        if (t.length > 20 && t.length > desc.length && t.length < 5000) desc = t;
-                    }
-                    if (desc.length > 20) break;
-                }
-
-                // Course name from breadcrumb at top of page
-                let courseName = '';
-                // The breadcrumb shows "Classroom > CourseName" at the top
-                const breadcrumb = document.querySelector('header a[href*="/c/"]');
-                if (breadcrumb) {
-                    courseName = breadcrumb.textContent.trim();
-                }
-                if (/^classroom$/i.test(courseName)) {
-                    courseName = '';
-                }
-                if (!courseName) {
-                    for (const b of document.querySelectorAll('[class*="onkcGd"], [class*="uDEFge"]')) {
-                        const t = b.textContent.trim();
-                        if (t.length > 2 && t.length < 100 && !/^classroom$/i.test(t)) { courseName = t; break; }
-                    }
-                }
-
-                // Attachments
-                const attachments = [];
-                for (const l of document.querySelectorAll(
-                    'a[href*="drive.google.com"], a[href*="docs.google.com"], ' +
-                    'a[href*="youtube.com"], a[href*="forms.google.com"], ' +
-                    'a[href*="collegeboard.org"], a[href*="myap"], a[href*="apclassroom"]'
-                )) attachments.push(l.href);
-
-                // Detect submission type
-                // Priority: AP Classroom LINK > AP on-page > Google Doc > Typed Response > File Upload > Unknown
-                let submissionType = 'unknown';
-                const pageText = (document.body?.innerText || '').toLowerCase();
-                const pageHtml = document.body?.outerHTML || '';
-
-                // Check for outbound AP Classroom links (distinct from AP questions on-page)
-                const hasAPLink = attachments.some(a => 
-                    a.includes('collegeboard.org') || a.includes('myap') || a.includes('apclassroom')
-                );
-                if (hasAPLink) {
-                    // This is an assignment with an outbound link to AP Classroom
-                    submissionType = 'AP_CLASSROOM_LINKED';
-                } else {
-                    // Check for AP Classroom questions ON the page (not links)
-                    const hasAPOnPage = pageText.includes('ap classroom') || 
-                                       pageText.includes('my ap') ||
-                                       pageHtml.includes('collegeboard.org');
-                    
-                    // Check for Google Doc attachment (template to edit)
-                    // Look for "Attach" button with Google Docs option, or linked doc templates
-                    const hasGoogleDocAttach = pageHtml.includes('docs.google.com/document/d/') || 
-                                               pageText.includes('attach a document') ||
-                                               pageText.includes('google doc');
-                    
-                    // Check for typed response field
-                    const hasTypedResponse = pageText.includes('your response') || 
-                                             pageText.includes('enter your response') ||
-                                             pageText.includes('type your response') ||
-                                             document.querySelector('textarea[placeholder*="response" i]') ||
-                                             document.querySelector('textarea[aria-label*="response" i]') ||
-                                             document.querySelector('div[contenteditable="true"]');
-                    
-                    // Check for file upload
-                    const hasFileUpload = pageText.includes('upload a file') || 
-                                          pageText.includes('attach file') ||
-                                          document.querySelector('input[type="file"]');
-
-                    if (hasAPOnPage) {
-                        submissionType = 'ap_classroom';
-                    } else if (hasGoogleDocAttach) {
-                        submissionType = 'google_doc';
-                    } else if (hasTypedResponse) {
-                        submissionType = 'typed_response';
-                    } else if (hasFileUpload) {
-                        submissionType = 'file_upload';
-                    }
-                }
-
-                return {
-                    title: assignmentTitle,
-                    description: desc.substring(0, 2000),
-                    attachments: [...new Set(attachments)],
-                    course_name: courseName,
-                    submission_type: submissionType
-                };
-            }
-        """)
-
         canonical_title = info.get("title", "")
         if canonical_title and not canonical_title.lower().startswith("classroom"):
             assignment.title = canonical_title
@@ -351,6 +473,92 @@ async def _enrich_assignment(page: Page, assignment: Assignment) -> None:
         logger.warning("Could not enrich: %s", assignment.title)
 
 
+def _dedupe_key(url: str) -> str:
+    class_id, assignment_id = _extract_ids_from_url(url)
+    return f"{class_id}:{assignment_id}" if assignment_id else url
+
+
+def _assignment_from_item(item: dict) -> Assignment:
+    class_id, assignment_id = _extract_ids_from_url(item["url"])
+    return Assignment(
+        course_name=item.get("class_name", ""),
+        title=item["title"],
+        due_date_str=item.get("due_text", ""),
+        assignment_url=item["url"],
+        class_id=class_id,
+        assignment_id=assignment_id,
+    )
+
+
+def _cache_entry(assignment: Assignment) -> dict:
+    return {
+        "due_text": assignment.due_date_str,
+        "title": assignment.title,
+        "course_name": assignment.course_name,
+        "description": assignment.description,
+        "attachment_urls": assignment.attachment_urls,
+        "submission_type": assignment.submission_type,
+        "fetched_at": time.time(),
+    }
+
+
+def _known_course_names(cache: dict, candidates: list[Assignment]) -> dict[str, str]:
+    """Map class_id -> course name from cached enrichments and the to-do list."""
+    names: dict[str, str] = {}
+    for url, entry in cache.items():
+        class_id, _ = _extract_ids_from_url(url)
+        if class_id and entry.get("course_name"):
+            names[class_id] = entry["course_name"]
+    for a in candidates:
+        if a.class_id and a.course_name:
+            names.setdefault(a.class_id, a.course_name)
+    return names
+
+
+def _apply_cached_enrichment(assignment: Assignment, cached: dict) -> None:
+    assignment.title = cached.get("title") or assignment.title
+    assignment.course_name = cached.get("course_name") or assignment.course_name
+    assignment.description = cached.get("description", "")
+    assignment.attachment_urls = list(cached.get("attachment_urls", []))
+    assignment.submission_type = cached.get("submission_type", "")
+
+
+def _skip_by_known_course(assignment: Assignment, course_names: dict[str, str]) -> bool:
+    """Borrow the course name of a sibling assignment and re-check the ignore list.
+
+    Lets ignored courses be dropped before paying for a detail-page load.
+    """
+    if assignment.course_name or assignment.class_id not in course_names:
+        return False
+    assignment.course_name = course_names[assignment.class_id]
+    return _should_skip(assignment.title, assignment.course_name)
+
+
+async def _enrich_worker(queue: asyncio.Queue, course_names: dict[str, str]) -> None:
+    """Drain the queue on a pooled tab so detail pages load in parallel."""
+    page = await acquire_page()
+    recycle = False
+    try:
+        while True:
+            try:
+                a = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if _skip_by_known_course(a, course_names):
+                logger.info("  SKIP (known course): %s — %s", a.course_name, a.title)
+                continue
+            logger.info("  Enriching: %s (%s)", a.title, a.course_name)
+            await _enrich_assignment(page, a)
+            if a.class_id and a.course_name:
+                course_names.setdefault(a.class_id, a.course_name)
+            await asyncio.sleep(random.uniform(0.5, 1.5))
+    except Exception:
+        recycle = True
+        raise
+    finally:
+        await release_page(page, recycle=recycle)
+
+
 async def scan_all_assignments() -> list[Assignment]:
     page = await get_page()
 
@@ -358,59 +566,67 @@ async def scan_all_assignments() -> list[Assignment]:
         await check_logged_in(page)
 
         assigned_items = await _scan_todo_tab(page, "Assigned")
-        missing_items = await _scan_todo_tab(page, "Missing")
+        missing_items = await _scan_todo_tab(page, "Missing", navigate=False)
         todo_items = assigned_items + missing_items
 
-        # Deduplicate + first-pass filter
-        seen_urls = set()
-        candidates: list[Assignment] = []
-        skipped = 0
-
+        # Deduplicate (ids collapse /u/0/ and /u/1/ copies) + first-pass filter
+        deduped: dict[str, dict] = {}
         for item in todo_items:
-            url = item.get("url", "")
-            if not url or url in seen_urls:
-                continue
-            seen_urls.add(url)
+            if item.get("url"):
+                deduped.setdefault(_dedupe_key(item["url"]), item)
 
-            title = item["title"]
+        candidates: list[Assignment] = []
+        for item in deduped.values():
             class_name = item.get("class_name", "")
-            class_id, assignment_id = _extract_ids_from_url(url)
-
-            if _should_skip(title, class_name):
-                logger.info("  SKIP (pre-filter): %s — %s", class_name, title)
-                skipped += 1
+            if _should_skip(item["title"], class_name):
+                logger.info("  SKIP (pre-filter): %s — %s", class_name, item["title"])
                 continue
-
-            candidates.append(
-                Assignment(
-                    course_name=class_name,
-                    title=title,
-                    due_date_str=item.get("due_text", ""),
-                    assignment_url=url,
-                    class_id=class_id,
-                    assignment_id=assignment_id,
-                )
-            )
+            candidates.append(_assignment_from_item(item))
+        skipped = len(deduped) - len(candidates)
 
         logger.info("Pre-filter: %d candidates, %d skipped", len(candidates), skipped)
 
-        # Enrich each and do a second-pass filter using the real course name
+        # Enrich (cache first, then a bounded pool of tabs for the rest)
+        cache = enrich_cache.load()
+        course_names = _known_course_names(cache, candidates)
+        fresh_cache: dict[str, dict] = {}
+        queue: asyncio.Queue[Assignment] = asyncio.Queue()
+        for a in candidates:
+            cached = enrich_cache.lookup(cache, a.assignment_url, a.due_date_str)
+            if cached:
+                logger.info("  Cached: %s (%s)", a.title, a.course_name)
+                _apply_cached_enrichment(a, cached)
+                fresh_cache[a.assignment_url] = cached
+            elif _skip_by_known_course(a, course_names):
+                logger.info("  SKIP (known course): %s — %s", a.course_name, a.title)
+            else:
+                queue.put_nowait(a)
+
+        workers = min(max(1, settings.enrich_concurrency), queue.qsize())
+        await asyncio.gather(
+            *(_enrich_worker(queue, course_names) for _ in range(workers))
+        )
+
+        # Second-pass filter using the real course name
         final: list[Assignment] = []
         for a in candidates:
-            logger.info("  Enriching: %s (%s)", a.title, a.course_name)
-            await _enrich_assignment(page, a)
-            await asyncio.sleep(2)
+            # submission_type is only set when the detail page was read
+            if a.assignment_url not in fresh_cache and a.submission_type:
+                fresh_cache[a.assignment_url] = _cache_entry(a)
 
-            # Second-pass filter with enriched course name
             if _should_skip(a.title, a.course_name):
                 logger.info("  SKIP (post-enrich): %s — %s", a.course_name, a.title)
                 continue
 
             final.append(a)
 
+        enrich_cache.save(fresh_cache)
         logger.info("Total assignments to process: %d", len(final))
         return final
 
     except Exception:
         logger.exception("Scanner failed")
         return []
+    finally:
+        if _pending_screenshots:
+            await asyncio.gather(*_pending_screenshots, return_exceptions=True)
@@ -1,15 +1,19 @@
 import asyncio
+import io
 import json
 import logging
 import random
 import re
 from dataclasses import dataclass, field
-from difflib import SequenceMatcher
-from typing import Awaitable, Callable
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Awaitable, Callable, Iterator
 
 from playwright.async_api import Locator, Page
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from browser.session import register_page_script
 from classroom.playwright_utils import MOD_KEY, click_with_retry, fill_with_retry
 
 logger = logging.getLogger(__name__)
@@ -22,12 +26,38 @@ EDITABLE_FIELD_SELECTOR = (
     ".ql-editor"
 )
 
-IGNORE_RE = re.compile(
-    r"\b(turn in|add class comment|private comment|stream|class comment|search|instructions?|submit)\b",
-    flags=re.IGNORECASE,
+QUESTION_MARKER_RE = re.compile(r"\?|:\s*$|_{3,}|\[\s*\]|\(\s*\)")
+ENUMERATOR_RE = re.compile(r"^\s*(?:\d+[.)]|[A-Z][.)]|[-*])\s+")
+
+# Keyword lists are matched against normalize_text() tokens, so each check is
+# one split plus set lookups instead of a regex alternation per line. Phrases
+# are space-padded so they only match on whole words.
+IGNORE_WORDS = frozenset({"stream", "search", "instruction", "instructions", "submit"})
+IGNORE_PHRASES = tuple(
+    f" {p} " for p in ("turn in", "class comment", "private comment")
+)
+QUESTION_WORDS = frozenset(
+    {"what", "why", "how", "describe", "explain", "list", "choose"}
+)
+QUESTION_PHRASES = tuple(
+    f" {p} " for p in ("brief summary", "source type", "free response")
 )
 
-QUESTION_MARKER_RE = re.compile(r"\?|:\s*$|_{3,}|\[\s*\]|\(\s*\)")
+_WS_RE = re.compile(r"\s+")
+# normalize_text: keep ASCII lowercase letters and digits, map every other
+# byte to a space. Non-ASCII characters arrive as "?" and become spaces too.
+_NORM_TABLE = bytes(c if 48 <= c <= 57 or 97 <= c <= 122 else 32 for c in range(256))
+
+# _clean_answer: strip LLM formatting (code fences, labels, markdown, tags)
+_FENCE_OPEN_RE = re.compile(r"^\s*```(?:json)?\s*", re.IGNORECASE)
+_FENCE_CLOSE_RE = re.compile(r"\s*```\s*$")
+_ANSWER_TAG_RE = re.compile(r"^\s*\[\s*answer\s*\d*\s*\]\s*", re.IGNORECASE | re.MULTILINE)
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_UNDER_RE = re.compile(r"__(.+?)__")
+_CODE_RE = re.compile(r"`([^`]+)`")
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s*", re.MULTILINE)
+_XMLTAG_RE = re.compile(r"<\s*/?\s*(?:text|answer)\s*>", re.IGNORECASE)
+_NEWLINES_RE = re.compile(r"\n{3,}")
 
 
 @dataclass
@@ -44,6 +74,7 @@ class DetectedField:
     role: str
     input_type: str
     nearby_text: str
+    y: float = 0.0
 
 
 @dataclass
@@ -56,57 +87,92 @@ class SmartFillResult:
 
 
 def normalize_text(value: str) -> str:
-    return re.sub(
-        r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", (value or "").lower())
-    ).strip()
+    raw = (value or "").lower().encode("ascii", "replace").translate(_NORM_TABLE)
+    return b" ".join(raw.split()).decode("ascii")
+
+
+def _has_marker_char(line: str) -> bool:
+    """Cheap prefilter: QUESTION_MARKER_RE cannot match without one of these."""
+    return "?" in line or ":" in line or "_" in line or "[" in line or "(" in line
+
+
+def _has_keyword(norm: str, words: frozenset[str], phrases: tuple[str, ...]) -> bool:
+    if not words.isdisjoint(norm.split()):
+        return True
+    padded = f" {norm} "
+    return any(p in padded for p in phrases)
+
+
+def _attachment_context_lines(
+    attachment_urls: list[str], material_texts: list[str]
+) -> Iterator[str]:
+    if attachment_urls:
+        yield "Attachment URLs:"
+        for i, url in enumerate(attachment_urls[:12], start=1):
+            yield f"{i}. {url}"
+    snippets = (m.strip() for m in material_texts if m and m.strip())
+    for i, text in enumerate(islice(snippets, 4), start=1):
+        if i == 1:
+            yield ""
+            yield "Attachment text snippets:"
+        yield f"[{i}] {text[:500]}"
 
 
 def summarize_attachment_context(
     attachment_urls: list[str], material_texts: list[str], max_chars: int = 2200
 ) -> str:
-    lines: list[str] = []
-    if attachment_urls:
-        lines.append("Attachment URLs:")
-        for i, url in enumerate(attachment_urls[:12], start=1):
-            lines.append(f"{i}. {url}")
-    snippets = [m.strip() for m in material_texts if m and m.strip()]
-    if snippets:
-        lines.append("")
-        lines.append("Attachment text snippets:")
-        for i, text in enumerate(snippets[:4], start=1):
-            lines.append(f"[{i}] {text[:500]}")
-    summary = "\n".join(lines).strip()
+    buf = io.StringIO()
+    complete = True
+    lines = _attachment_context_lines(attachment_urls, material_texts)
+    for n, line in enumerate(lines):
+        # Stop once past the budget; the +1 covers the leading newline that
+        # strip() drops when there are snippets but no URLs.
+        if buf.tell() > max_chars + 1:
+            complete = False
+            break
+        if n:
+            buf.write("\n")
+        buf.write(line)
+    summary = buf.getvalue()
+    summary = summary.strip() if complete else summary.lstrip()
     return summary[:max_chars]
 
 
 def extract_doc_section_prompts(doc_text: str, max_fields: int = 24) -> list[str]:
+    return list(_section_prompts(doc_text or "", max_fields))
+
+
+# Paster checks the same doc text several times per assignment (template
+# detection, then filling), so results are memoized on the full text.
+@lru_cache(maxsize=64)
+def _section_prompts(doc_text: str, max_fields: int) -> tuple[str, ...]:
     prompts: list[str] = []
     seen: set[str] = set()
-    for raw in (doc_text or "").splitlines():
-        line = re.sub(r"\s+", " ", raw).strip()
+    for raw in doc_text.splitlines():
+        # Reject lines far outside the accepted length before the whitespace
+        # regex; the 2x slack leaves room for runs of spaces and tabs.
+        if not (4 <= len(raw) <= 520):
+            continue
+        line = _WS_RE.sub(" ", raw).strip()
         if not (4 <= len(line) <= 260):
             continue
-        lower = line.lower()
-        if IGNORE_RE.search(lower):
+        norm = normalize_text(line)
+        if _has_keyword(norm, IGNORE_WORDS, IGNORE_PHRASES):
             continue
         prompt_like = bool(
-            QUESTION_MARKER_RE.search(line)
-            or re.match(r"^\s*(?:\d+[.)]|[A-Z][.)]|[-*])\s+", line)
-            or re.search(
-                r"\b(what|why|how|describe|explain|list|choose|brief summary|source type|free response)\b",
-                lower,
-            )
+            (_has_marker_char(line) and QUESTION_MARKER_RE.search(line))
+            or ENUMERATOR_RE.match(line)
+            or _has_keyword(norm, QUESTION_WORDS, QUESTION_PHRASES)
         )
         if not prompt_like:
             continue
-        norm = normalize_text(line)
         if not norm or norm in seen:
             continue
         seen.add(norm)
         prompts.append(line)
         if len(prompts) >= max_fields:
             break
-    return prompts
+    return tuple(prompts)
 
 
 # ---------------------------------------------------------------------------
@@ -114,135 +180,190 @@ def extract_doc_section_prompts(doc_text: str, max_fields: int = 24) -> list[str
 # ---------------------------------------------------------------------------
 
 
+_SLOW_SCROLL_JS = """
+async () => {
+    const total = document.body.scrollHeight;
+    const step = Math.max(200, Math.floor(window.innerHeight / 2));
+    for (let pos = step; pos - step < total; pos += step) {
+        window.scrollTo(0, pos);
+        await new Promise((r) => setTimeout(r, 150 + Math.random() * 200));
+    }
+    window.scrollTo(0, 0);
+}
+"""
+
+
 async def _slow_scroll_page(page: Page) -> None:
+    # Whole scroll runs in the page: one round-trip instead of one per step.
     try:
-        total_height = await page.evaluate("() => document.body.scrollHeight")
-        viewport_h = await page.evaluate("() => window.innerHeight")
-        step = max(200, viewport_h // 2)
-        pos = 0
-        while pos < total_height:
-            pos += step
-            await page.evaluate(f"window.scrollTo(0, {pos})")
-            await asyncio.sleep(random.uniform(0.15, 0.35))
-        await page.evaluate("window.scrollTo(0, 0)")
+        await page.evaluate(_SLOW_SCROLL_JS)
         await asyncio.sleep(0.3)
     except Exception:
         pass
 
 
-async def _extract_questions_from_page(page: Page) -> list[DetectedQuestion]:
-    """Extract question-like text elements in DOM order."""
-    raw = await page.evaluate("""
-    () => {
-        const clean = (t) => (t || '').replace(/\\s+/g, ' ').trim();
-        const ignore = /(turn in|add class comment|private comment|stream|search|submit|instructions?)/i;
-        const qLike = (t) => {
-            if (!t || t.length < 4 || t.length > 500) return false;
-            if (ignore.test(t)) return false;
-            return /\\?|:\\s*$|_{3,}|\\[\\s*\\]|\\(\\s*\\)/.test(t)
-                || /^\\s*(?:\\d+[.)]|[A-Z][.)]|[-*])\\s+/.test(t)
-                || /\\b(what|why|how|describe|explain|list|choose|write|brief summary|your (answer|response|thoughts)|free response)\\b/i.test(t);
-        };
-        const seen = new Set();
-        const out = [];
-        const tags = 'h1,h2,h3,h4,h5,label,p,span,div[role="heading"],legend';
-        const els = Array.from(document.querySelectorAll(tags));
-        for (const el of els) {
-            const rect = el.getBoundingClientRect();
-            const style = getComputedStyle(el);
-            if (style.display === 'none' || style.visibility === 'hidden') continue;
-            if (rect.width < 5 || rect.height < 5) continue;
-            const t = clean(el.textContent || el.innerText);
-            if (!qLike(t)) continue;
-            const key = t.toLowerCase().slice(0, 120);
-            if (seen.has(key)) continue;
-            seen.add(key);
-            out.push({ snippet: t.slice(0, 300), y: rect.top });
-        }
-        out.sort((a, b) => a.y - b.y);
-        return out;
+_EXTRACT_QUESTIONS_JS = """
+() => {
+    const clean = (t) => (t || '').replace(/\\s+/g, ' ').trim();
+    const ignore = /(turn in|add class comment|private comment|stream|search|submit|instructions?)/i;
+    const qLike = (t) => {
+        if (!t || t.length < 4 || t.length > 500) return false;
+        if (ignore.test(t)) return false;
+        return /\\?|:\\s*$|_{3,}|\\[\\s*\\]|\\(\\s*\\)/.test(t)
+            || /^\\s*(?:\\d+[.)]|[A-Z][.)]|[-*])\\s+/.test(t)
+            || /\\b(what|why|how|describe|explain|list|choose|write|brief summary|your (answer|response|thoughts)|free response)\\b/i.test(t);
+    };
+    const seen = new Set();
+    const out = [];
+    const tags = 'h1,h2,h3,h4,h5,label,p,span,div[role="heading"],legend';
+    const els = Array.from(document.querySelectorAll(tags));
+    for (const el of els) {
+        const rect = el.getBoundingClientRect();
+        const style = getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden') continue;
+        if (rect.width < 5 || rect.height < 5) continue;
+        const t = clean(el.textContent || el.innerText);
+        if (!qLike(t)) continue;
+        const key = t.toLowerCase().slice(0, 120);
+        if (seen.has(key)) continue;
+        seen.add(key);
+        out.push({ snippet: t.slice(0, 300), y: rect.top });
     }
-    """)
-    return [DetectedQuestion(index=i, snippet=r["snippet"]) for i, r in enumerate(raw)]
-
-
-async def _extract_editable_fields(page: Page) -> list[DetectedField]:
-    """Find all visible editable fields in DOM order and tag each with a unique id."""
-    raw = await page.evaluate(
-        """
-    (selector) => {
-        const clean = (t) => (t || '').replace(/\\s+/g, ' ').trim();
-        const isVisible = (el) => {
-            const r = el.getBoundingClientRect();
-            const s = getComputedStyle(el);
-            if (s.display === 'none' || s.visibility === 'hidden' || Number(s.opacity || 1) === 0) return false;
-            return r.width > 6 && r.height > 6 && r.bottom > 0 && r.right > 0;
-        };
-        const ignore = /(turn in|add class comment|private comment|stream|search|submit)/i;
-        const results = [];
-        const nodes = Array.from(document.querySelectorAll(selector));
-        let idx = 0;
-        for (const el of nodes) {
-            if (!isVisible(el)) continue;
-            if (el.closest('[aria-hidden="true"]')) continue;
-            const ariaLabel = clean(el.getAttribute('aria-label'));
-            const placeholder = clean(el.getAttribute('placeholder'));
-            const combo = ariaLabel + ' ' + placeholder;
-            if (ignore.test(combo)) continue;
-
-            idx += 1;
-            const id = `sf-field-${Date.now()}-${idx}`;
-            el.setAttribute('data-sf-field-id', id);
-
-            // grab closest question text above this field
-            const rect = el.getBoundingClientRect();
-            let nearText = ariaLabel || placeholder || '';
-            if (!nearText) {
-                const container = el.closest('form, article, section, li, div[role="listitem"], [role="main"]') || el.parentElement;
-                if (container) {
-                    const cands = container.querySelectorAll('h1,h2,h3,h4,label,p,span,div[role="heading"],legend');
-                    let best = null;
-                    let bestDist = 9999;
-                    for (const c of cands) {
-                        if (c === el || c.contains(el) || el.contains(c)) continue;
-                        const cR = c.getBoundingClientRect();
-                        if (cR.bottom > rect.top + 18) continue;
-                        if (Math.abs(cR.left - rect.left) > 700) continue;
-                        const dist = Math.max(0, rect.top - cR.bottom);
-                        if (dist < bestDist) {
-                            bestDist = dist;
-                            best = clean(c.textContent || c.innerText);
-                        }
-                    }
-                    if (best && best.length >= 3 && best.length <= 300) nearText = best;
-                }
+    out.sort((a, b) => a.y - b.y);
+    return out;
+}
+"""
+
+_EXTRACT_FIELDS_JS = """
+(selector) => {
+    const clean = (t) => (t || '').replace(/\\s+/g, ' ').trim();
+    const isVisible = (el) => {
+        const r = el.getBoundingClientRect();
+        const s = getComputedStyle(el);
+        if (s.display === 'none' || s.visibility === 'hidden' || Number(s.opacity || 1) === 0) return false;
+        return r.width > 6 && r.height > 6 && r.bottom > 0 && r.right > 0;
+    };
+    const ignore = /(turn in|add class comment|private comment|stream|search|submit)/i;
+    // Label candidates sorted by bottom edge, built on first use. Each field
+    // binary-searches for the last label ending above it and walks back to the
+    // first one inside its container, instead of rescanning every label.
+    let labels = null;
+    const nearestLabel = (el, container, rect) => {
+        if (!labels) {
+            labels = Array.from(document.querySelectorAll('h1,h2,h3,h4,label,p,span,div[role="heading"],legend'))
+                .map((c) => ({ el: c, rect: c.getBoundingClientRect() }))
+                .sort((a, b) => a.rect.bottom - b.rect.bottom);
+        }
+        let lo = 0;
+        let hi = labels.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (labels[mid].rect.bottom <= rect.top + 18) lo = mid + 1;
+            else hi = mid;
+        }
+        for (let i = lo - 1; i >= 0; i--) {
+            const c = labels[i];
+            if (rect.top - c.rect.bottom >= 9999) break;
+            if (c.el === el || c.el.contains(el) || el.contains(c.el)) continue;
+            if (!container.contains(c.el)) continue;
+            if (Math.abs(c.rect.left - rect.left) > 700) continue;
+            return clean(c.el.textContent || c.el.innerText);
+        }
+        return null;
+    };
+    const results = [];
+    const nodes = Array.from(document.querySelectorAll(selector));
+    let idx = 0;
+    for (const el of nodes) {
+        if (!isVisible(el)) continue;
+        if (el.closest('[aria-hidden="true"]')) continue;
+        const ariaLabel = clean(el.getAttribute('aria-label'));
+        const placeholder = clean(el.getAttribute('placeholder'));
+        const combo = ariaLabel + ' ' + placeholder;
+        if (ignore.test(combo)) continue;
+
+        idx += 1;
+        const id = `sf-field-${Date.now()}-${idx}`;
+        el.setAttribute('data-sf-field-id', id);
+
+        // grab closest question text above this field
+        const rect = el.getBoundingClientRect();
+        let nearText = ariaLabel || placeholder || '';
+        if (!nearText) {
+            const container = el.closest('form, article, section, li, div[role="listitem"], [role="main"]') || el.parentElement;
+            if (container) {
+                const best = nearestLabel(el, container, rect);
+                if (best && best.length >= 3 && best.length <= 300) nearText = best;
             }
-            if (!nearText) {
-                let prev = el.previousElementSibling;
-                let hops = 0;
-                while (prev && hops < 3) {
-                    const t = clean(prev.textContent || prev.innerText);
-                    if (t && t.length >= 3 && t.length <= 300 && !ignore.test(t)) { nearText = t; break; }
-                    prev = prev.previousElementSibling;
-                    hops++;
-                }
+        }
+        if (!nearText) {
+            let prev = el.previousElementSibling;
+            let hops = 0;
+            while (prev && hops < 3) {
+                const t = clean(prev.textContent || prev.innerText);
+                if (t && t.length >= 3 && t.length <= 300 && !ignore.test(t)) { nearText = t; break; }
+                prev = prev.previousElementSibling;
+                hops++;
             }
-            results.push({
-                field_id: id,
-                tag: (el.tagName || '').toLowerCase(),
-                role: el.getAttribute('role') || '',
-                input_type: el.getAttribute('type') || '',
-                near: nearText || ('Field ' + idx),
-                y: rect.top,
-            });
         }
-        results.sort((a, b) => a.y - b.y);
-        return results;
+        results.push({
+            field_id: id,
+            tag: (el.tagName || '').toLowerCase(),
+            role: el.getAttribute('role') || '',
+            input_type: el.getAttribute('type') || '',
+            near: nearText || ('Field ' + idx),
+            y: rect.top + window.scrollY,
+        });
     }
-    """,
-        EDITABLE_FIELD_SELECTOR,
-    )
+    results.sort((a, b) => a.y - b.y);
+    return results;
+}
+"""
+
+# Sets each [field_id, value] through the native value setter (so framework-
+# controlled inputs see the change), fires input/change, and reports per field
+# whether the value reads back unchanged. No focus or keyboard is involved.
+_SET_VALUES_JS = """
+(pairs) => pairs.map(([id, value]) => {
+    const el = document.querySelector(`[data-sf-field-id="${id}"]`);
+    if (!(el instanceof HTMLInputElement || el instanceof HTMLTextAreaElement)) return false;
+    const proto = el instanceof HTMLInputElement ? HTMLInputElement.prototype : HTMLTextAreaElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    return el.value === value;
+})
+"""
+
+# Installed on every page of the main browser context; pages from other
+# contexts (AP Classroom) get it defined on first use by _run_extractor.
+_EXTRACTORS_JS = (
+    "(() => {"
+    f"const questions = {_EXTRACT_QUESTIONS_JS};"
+    f"const fields = {_EXTRACT_FIELDS_JS};"
+    "const all = (selector) => ({ fields: fields(selector), questions: questions() });"
+    f"const setValues = {_SET_VALUES_JS};"
+    "window.__sf = Object.assign(window.__sf || {}, { questions, fields, all, setValues });"
+    "})();"
+)
+register_page_script(_EXTRACTORS_JS)
+
 
+async def _run_extractor(page: Page, name: str, arg: object = None) -> Any:
+    """Call a window.__sf extractor, defining it first if the page lacks it."""
+    call = f"(arg) => window.__sf.{name}(arg)"
+    try:
+        return await page.evaluate(call, arg)
+    except Exception:
+        await page.evaluate(_EXTRACTORS_JS)
+        return await page.evaluate(call, arg)
+
+
+def _questions_from_raw(raw: list[dict]) -> list[DetectedQuestion]:
+    return [DetectedQuestion(index=i, snippet=r["snippet"]) for i, r in enumerate(raw)]
+
+
+def _fields_from_raw(raw: list[dict]) -> list[DetectedField]:
     return [
         DetectedField(
             index=i,
@@ -251,90 +372,124 @@ async def _extract_editable_fields(page: Page) -> list[DetectedField]:
             role=r.get("role", ""),
             input_type=r.get("input_type", ""),
             nearby_text=r.get("near", f"Field {i + 1}"),
+            y=r.get("y", 0.0),
         )
         for i, r in enumerate(raw)
     ]
 
 
+async def _extract_questions_from_page(page: Page) -> list[DetectedQuestion]:
+    """Extract question-like text elements in DOM order."""
+    return _questions_from_raw(await _run_extractor(page, "questions"))
+
+
+async def _extract_editable_fields(page: Page) -> list[DetectedField]:
+    """Find all visible editable fields in DOM order and tag each with a unique id."""
+    raw = await _run_extractor(page, "fields", EDITABLE_FIELD_SELECTOR)
+    return _fields_from_raw(raw)
+
+
+async def _extract_all(
+    page: Page,
+) -> tuple[list[DetectedField], list[DetectedQuestion]]:
+    """Editable fields and question snippets from one page.evaluate."""
+    raw = await _run_extractor(page, "all", EDITABLE_FIELD_SELECTOR)
+    return _fields_from_raw(raw["fields"]), _questions_from_raw(raw["questions"])
+
+
 # ---------------------------------------------------------------------------
 #  Phase 2 -- Match LLM answers to fields
 # ---------------------------------------------------------------------------
 
 
-def _similarity(a: str, b: str) -> float:
-    na = normalize_text(a)
-    nb = normalize_text(b)
+def _normalized_tokens(text: str) -> tuple[str, set[str]]:
+    norm = normalize_text(text)
+    return norm, set(norm.split())
+
+
+def _similarity(na: str, at: set[str], nb: str, bt: set[str]) -> float:
+    """Score two texts already run through `_normalized_tokens`."""
     if not na or not nb:
         return 0.0
     if na in nb or nb in na:
         return 1.0
-    ratio = SequenceMatcher(None, na, nb).ratio()
-    at = set(na.split())
-    bt = set(nb.split())
-    overlap = len(at & bt) / max(1, len(at | bt))
-    return ratio * 0.65 + overlap * 0.35
+    return len(at & bt) / max(1, len(at | bt))
 
 
 def _clean_answer(text: str) -> str:
     out = (text or "").replace("\r\n", "\n").replace("\r", "\n").strip()
-    out = re.sub(r"^\s*```(?:json)?\s*", "", out, flags=re.IGNORECASE)
-    out = re.sub(r"\s*```\s*$", "", out)
-    out = re.sub(
-        r"^\s*\[\s*answer\s*\d*\s*\]\s*", "", out, flags=re.IGNORECASE | re.MULTILINE
-    )
-    out = re.sub(r"\*\*(.+?)\*\*", r"\1", out)
-    out = re.sub(r"__(.+?)__", r"\1", out)
-    out = re.sub(r"`([^`]+)`", r"\1", out)
-    out = re.sub(r"^\s*#{1,6}\s*", "", out, flags=re.MULTILINE)
-    out = re.sub(r"<\s*/?\s*(?:text|answer)\s*>", "", out, flags=re.IGNORECASE)
-    out = re.sub(r"\n{3,}", "\n\n", out)
+    out = _FENCE_OPEN_RE.sub("", out)
+    out = _FENCE_CLOSE_RE.sub("", out)
+    out = _ANSWER_TAG_RE.sub("", out)
+    out = _BOLD_RE.sub(r"\1", out)
+    out = _UNDER_RE.sub(r"\1", out)
+    out = _CODE_RE.sub(r"\1", out)
+    out = _HEADING_RE.sub("", out)
+    out = _XMLTAG_RE.sub("", out)
+    out = _NEWLINES_RE.sub("\n\n", out)
     return out.strip()
 
 
-def match_answers_to_fields(
-    fields: list[DetectedField],
-    answers: list[dict],
-) -> list[tuple[DetectedField, str, float]]:
-    """Return (field, answer_text, score) in field order. Positional fallback if scores are low."""
+def _clean_answers(answers: list[dict]) -> list[tuple[int, str, str]]:
+    """(index, question, cleaned answer) for every answer that is non-empty."""
     cleaned: list[tuple[int, str, str]] = []
     for i, item in enumerate(answers):
         q = str(item.get("question") or item.get("question_snippet") or "").strip()
         a = _clean_answer(str(item.get("answer") or ""))
         if a:
             cleaned.append((i, q, a))
+    return cleaned
+
 
+def match_answers_to_fields(
+    fields: list[DetectedField],
+    answers: list[dict],
+) -> list[tuple[DetectedField, str, float]]:
+    """Return (field, answer_text, score) in field order. Positional fallback if scores are low."""
+    return _match_cleaned_answers(fields, _clean_answers(answers))
+
+
+def _match_cleaned_answers(
+    fields: list[DetectedField],
+    cleaned: list[tuple[int, str, str]],
+) -> list[tuple[DetectedField, str, float]]:
     if not cleaned:
         return [(f, "", 0.0) for f in fields]
 
-    results: list[tuple[DetectedField, str, float]] = []
+    # Score every (field, answer) pair once, then assign the strongest pairs
+    # first so an early field cannot take an answer a later field fits better.
+    answer_norms = [_normalized_tokens(aq) for _, aq, _ in cleaned]
+    pairs: list[tuple[float, int, int]] = []
+    for fi, fld in enumerate(fields):
+        fn, ft = _normalized_tokens(fld.nearby_text)
+        for ci, (an, atok) in enumerate(answer_norms):
+            score = _similarity(fn, ft, an, atok)
+            if score >= 0.15:
+                pairs.append((score, fi, ci))
+    pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+
+    assigned: dict[int, tuple[int, float]] = {}
     used: set[int] = set()
+    for score, fi, ci in pairs:
+        if fi in assigned or ci in used:
+            continue
+        assigned[fi] = (ci, score)
+        used.add(ci)
 
+    results: list[tuple[DetectedField, str, float]] = []
     for fi, fld in enumerate(fields):
-        best_idx = -1
-        best_score = -1.0
-        best_text = ""
-
-        for ai, aq, at in cleaned:
-            if ai in used:
-                continue
-            score = _similarity(fld.nearby_text, aq)
-            if score > best_score:
-                best_score = score
-                best_idx = ai
-                best_text = at
-
-        if best_idx >= 0 and best_score >= 0.15:
-            used.add(best_idx)
-            results.append((fld, best_text, best_score))
-            if best_score < 0.3:
+        if fi in assigned:
+            ci, score = assigned[fi]
+            results.append((fld, cleaned[ci][2], score))
+            if score < 0.3:
                 logger.warning(
                     "  SmartFill AMBIGUOUS MATCH: field '%s' matched with score %.2f (low confidence)",
                     fld.nearby_text[:60],
-                    best_score,
+                    score,
                 )
         else:
             positional = fi if fi < len(cleaned) else len(cleaned) - 1
-            ai, _, at = cleaned[positional]
+            _, _, at = cleaned[positional]
             results.append((fld, at, 0.0))
 
     return results
@@ -368,7 +523,9 @@ async def _clear_field(page: Page, locator: Locator) -> None:
 async def _human_type(
     page: Page, text: str, min_ms: int = 20, max_ms: int = 48
 ) -> None:
-    for li, line in enumerate(text.split("\n")):
+    lines = text.split("\n")
+    last = len(lines) - 1
+    for li, line in enumerate(lines):
         words = line.split(" ")
         buf: list[str] = []
         burst = random.randint(2, 5)
@@ -385,7 +542,7 @@ async def _human_type(
                     await asyncio.sleep(random.uniform(0.06, 0.25))
         if buf:
             await page.keyboard.type("".join(buf), delay=random.randint(min_ms, max_ms))
-        if li < len(text.split("\n")) - 1:
+        if li < last:
             await page.keyboard.press("Enter")
             await asyncio.sleep(random.uniform(0.04, 0.12))
 
@@ -399,8 +556,15 @@ async def _fill_single_field(
 ) -> bool:
     loc = page.locator(f'[data-sf-field-id="{fld.field_id}"]').first
 
+    # Scroll to the position recorded at extraction time in one evaluate; the
+    # click below still auto-scrolls if layout has shifted since.
     try:
-        await loc.scroll_into_view_if_needed(timeout=8000)
+        if fld.y:
+            await page.evaluate(
+                "(y) => window.scrollTo(0, Math.max(0, y - 100))", fld.y
+            )
+        else:
+            await loc.scroll_into_view_if_needed(timeout=8000)
     except Exception:
         pass
     await asyncio.sleep(0.15)
@@ -436,6 +600,29 @@ async def _fill_single_field(
     return True
 
 
+def _record_fill(
+    result: SmartFillResult,
+    ok: bool,
+    idx: int,
+    fld: DetectedField,
+    answer_text: str,
+    score: float,
+) -> None:
+    if ok:
+        result.filled_count += 1
+        logger.info(
+            "  SmartFill: filled field %d/%d | nearby='%s' | score=%.2f | answer_len=%d",
+            idx + 1,
+            result.total_fields,
+            fld.nearby_text[:60],
+            score,
+            len(answer_text),
+        )
+    else:
+        result.failed_count += 1
+        logger.warning("  SmartFill: FAILED field %d (%s)", idx, fld.nearby_text[:60])
+
+
 # ---------------------------------------------------------------------------
 #  Phase 4 -- Fallback: dump all answers into first visible field
 # ---------------------------------------------------------------------------
@@ -462,23 +649,8 @@ async def _fallback_fill_first_field(
 # ---------------------------------------------------------------------------
 
 
-@retry(
-    reraise=True,
-    stop=stop_after_attempt(3),
-    wait=wait_fixed(2),
-    retry=retry_if_exception_type((Exception,)),
-)
-async def smart_fill_fields(
-    page: Page,
-    answers: list[dict],
-    debug_dir: str | None = None,
-) -> SmartFillResult:
-    """
-    Robust multi-field filler.
-    `answers` is a list of {"index": int, "question_snippet": str, "answer": str}.
-    """
-    result = SmartFillResult()
-
+async def _prepare(page: Page) -> list[DetectedField]:
+    """Let the page settle, scroll lazy-loaded fields in, and extract them."""
     # Wait for full page load + extra settle time
     try:
         await page.wait_for_load_state("networkidle", timeout=45000)
@@ -491,7 +663,6 @@ async def smart_fill_fields(
 
     # Extract fields
     fields = await _extract_editable_fields(page)
-    result.total_fields = len(fields)
 
     logger.info("  SmartFill: detected %d editable field(s)", len(fields))
     for i, f in enumerate(fields):
@@ -504,19 +675,27 @@ async def smart_fill_fields(
             "  SmartFill AMBIGUOUS: detected %d fields - many fields may indicate incorrect page or template. Verify assignment submission type.",
             len(fields),
         )
+    return fields
 
-    if not fields:
-        logger.warning("  SmartFill: no editable fields found on page")
-        return result
 
-    if not answers:
-        logger.warning("  SmartFill: no answers provided")
-        return result
-
-    # Match answers to fields
-    matches = match_answers_to_fields(fields, answers)
+# Only the fill phase is retried, and only on timeouts: a retry of the whole
+# flow would redo the settle wait, slow scroll and extraction each time.
+@retry(
+    reraise=True,
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(min=1, max=8),
+    retry=retry_if_exception_type(PlaywrightTimeoutError),
+)
+async def _fill_all(
+    page: Page,
+    fields: list[DetectedField],
+    cleaned: list[tuple[int, str, str]],
+    debug_dir: str | None = None,
+) -> SmartFillResult:
+    result = SmartFillResult(total_fields=len(fields))
+    matches = _match_cleaned_answers(fields, cleaned)
 
-    # Fill each field in order
+    pending: list[tuple[int, DetectedField, str, float]] = []
     for idx, (fld, answer_text, score) in enumerate(matches):
         if not answer_text.strip():
             logger.warning(
@@ -526,35 +705,44 @@ async def smart_fill_fields(
             )
             result.failed_count += 1
             continue
+        pending.append((idx, fld, answer_text, score))
+
+    # Inputs and textareas get their values in one evaluate that sets them
+    # directly and reads them back; Playwright's fill can't be overlapped since
+    # it focuses the element and inserts text through the shared keyboard. A
+    # field that doesn't read back falls back to click-and-type below.
+    dom_fills = [m for m in pending if m[1].tag in ("textarea", "input")]
+    dom_ok: list[bool] = []
+    if dom_fills:
+        try:
+            dom_ok = await _run_extractor(
+                page, "setValues", [[fld.field_id, text] for _, fld, text, _ in dom_fills]
+            )
+        except Exception as exc:
+            logger.warning("  SmartFill: batch value set failed: %s", exc)
+    dom_filled = {m[0] for m, ok in zip(dom_fills, dom_ok) if ok}
+    for idx, fld, answer_text, score in dom_fills:
+        if idx in dom_filled:
+            _record_fill(result, True, idx, fld, answer_text, score)
+    if dom_filled and debug_dir:
+        try:
+            await page.screenshot(path=f"{debug_dir}/debug_fill_inputs.png")
+        except Exception:
+            pass
 
+    # Everything else needs keyboard focus, so it is typed one field at a time
+    for idx, fld, answer_text, score in pending:
+        if idx in dom_filled:
+            continue
         ok = await _fill_single_field(
             page, fld, answer_text, debug_dir=debug_dir, field_num=idx
         )
-        if ok:
-            result.filled_count += 1
-            logger.info(
-                "  SmartFill: filled field %d/%d | nearby='%s' | score=%.2f | answer_len=%d",
-                idx + 1,
-                len(fields),
-                fld.nearby_text[:60],
-                score,
-                len(answer_text),
-            )
-        else:
-            result.failed_count += 1
-            logger.warning(
-                "  SmartFill: FAILED field %d (%s)", idx, fld.nearby_text[:60]
-            )
-
+        _record_fill(result, ok, idx, fld, answer_text, score)
         await asyncio.sleep(random.uniform(0.8, 1.8))
 
     # If no fields were filled, try fallback
-    if result.filled_count == 0 and answers:
-        combined = "\n\n".join(
-            _clean_answer(str(a.get("answer", "")))
-            for a in answers
-            if str(a.get("answer", "")).strip()
-        )
+    if result.filled_count == 0 and cleaned:
+        combined = "\n\n".join(a for _, _, a in cleaned)
         if combined.strip():
             ok = await _fallback_fill_first_field(page, fields, combined)
             if ok:
@@ -564,6 +752,28 @@ async def smart_fill_fields(
     return result
 
 
+async def smart_fill_fields(
+    page: Page,
+    answers: list[dict],
+    debug_dir: str | None = None,
+) -> SmartFillResult:
+    """
+    Robust multi-field filler.
+    `answers` is a list of {"index": int, "question_snippet": str, "answer": str}.
+    """
+    fields = await _prepare(page)
+    if not fields:
+        logger.warning("  SmartFill: no editable fields found on page")
+        return SmartFillResult()
+
+    if not answers:
+        logger.warning("  SmartFill: no answers provided")
+        return SmartFillResult(total_fields=len(fields))
+
+    # The cleaned answers are matched to fields and reused by the fallback
+    return await _fill_all(page, fields, _clean_answers(answers), debug_dir)
+
+
 # ---------------------------------------------------------------------------
 #  Legacy wrappers (kept for backward compat with paster.py doc-section flow)
 # ---------------------------------------------------------------------------
@@ -616,20 +826,22 @@ def match_questions_to_answers(
 
     matches: list[tuple[str, str, str, float]] = []
     used_indexes: set[int] = set()
+    answer_norms = [(i, q, a, *_normalized_tokens(q)) for i, q, a in cleaned_answers]
 
     for idx, question in enumerate(question_snippets):
         best: tuple[int, str, str, float] | None = None
-        for ans_idx, ans_question, ans_text in cleaned_answers:
+        qn, qt = _normalized_tokens(question)
+        for ans_idx, ans_question, ans_text, an, atok in answer_norms:
             if ans_idx in used_indexes:
                 continue
-            score = _similarity(question, ans_question)
+            score = _similarity(qn, qt, an, atok)
             if best is None or score > best[3]:
                 best = (ans_idx, ans_question, ans_text, score)
 
         if best is None:
             fallback_idx = min(idx, len(cleaned_answers) - 1)
-            _, ans_question, ans_text = cleaned_answers[fallback_idx]
-            score = _similarity(question, ans_question)
+            _, ans_question, ans_text, an, atok = answer_norms[fallback_idx]
+            score = _similarity(qn, qt, an, atok)
             matches.append((question, ans_question, ans_text, score))
             continue
 
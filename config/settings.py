@@ -1,3 +1,4 @@
+from functools import cached_property, lru_cache
 from pathlib import Path
 from pydantic_settings import BaseSettings
 
@@ -6,13 +7,24 @@ _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 _ENV_FILE = _PROJECT_ROOT / ".env"
 
 
+def _keyword_set(raw: str) -> frozenset[str]:
+    return frozenset(k.strip().lower() for k in raw.split(",") if k.strip())
+
+
 class Settings(BaseSettings):
     model_config = {"env_file": str(_ENV_FILE), "env_file_encoding": "utf-8"}
 
     gemini_api_key: str = ""
     gemini_model: str = "gemini-2.0-flash"
+    # Most Gemini requests allowed in flight at once across threads
+    gemini_max_concurrency: int = 4
+    # Client-side request budget per model per minute (0 disables the limiter)
+    gemini_rpm: int = 60
 
     studyflow_sheet_url: str = ""
+    # Service-account JSON with edit access to the sheet; when set, rows are
+    # appended through the Sheets API instead of the browser
+    google_service_account_file: str = ""
 
     schedule_start_hour: int = 9
     schedule_start_minute: int = 0
@@ -28,10 +40,26 @@ class Settings(BaseSettings):
     delay_max_seconds: int = 720
     summary_email_timeout_seconds: int = 90
 
+    # Number of browser tabs used to open assignment detail pages in parallel
+    enrich_concurrency: int = 3
+    # Reuse a scanned assignment's details for this long if its due text is unchanged
+    enrich_cache_ttl_hours: int = 24
+
     send_email_summary: bool = False
     paste_retry_attempts: int = 2
     paste_attempt_timeout_seconds: int = 300
 
+    # Reuse Gemini responses for prompts that were already answered
+    llm_cache_enabled: bool = True
+    # Cached responses older than this are ignored and fetched again
+    llm_cache_ttl_hours: int = 24
+
+    # Skip images/fonts/media on the Gmail and Sheets tabs (turn off to debug those pages)
+    block_heavy_resources: bool = True
+
+    # Save full-page debug screenshots while scanning (slow; off in normal runs)
+    debug: bool = False
+
     # Comma-separated keywords — courses matching any of these are skipped
     ignore_courses: str = (
         "FBLA,DECA,Speech and Debate,Speech & Debate,Honor Society,"
@@ -42,6 +70,16 @@ class Settings(BaseSettings):
     # Comma-separated keywords — assignment titles matching any of these are skipped
     ignore_assignments: str = "LEQ,DBQ,MCQ,SAQ,FRQ"
 
+    @cached_property
+    def ignore_courses_set(self) -> frozenset[str]:
+        """Lowercased `ignore_courses` keywords."""
+        return _keyword_set(self.ignore_courses)
+
+    @cached_property
+    def ignore_assignments_set(self) -> frozenset[str]:
+        """Lowercased `ignore_assignments` keywords."""
+        return _keyword_set(self.ignore_assignments)
+
     @property
     def project_root(self) -> Path:
         return _PROJECT_ROOT
@@ -62,5 +100,23 @@ class Settings(BaseSettings):
     def assignment_state_file(self) -> Path:
         return self.project_root / ".assignment_state.json"
 
+    @property
+    def cache_dir(self) -> Path:
+        return self.project_root / ".cache"
+
+    @property
+    def enrich_cache_file(self) -> Path:
+        return self.cache_dir / "enrich.json"
+
+    @property
+    def llm_cache_file(self) -> Path:
+        return self.cache_dir / "llm.sqlite"
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """The process-wide Settings; .env is read once. Use cache_clear() to reload."""
+    return Settings()
+
 
-settings = Settings()
+settings = get_settings()
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+
+from classroom.scanner import Assignment
+from drafting.llm_drafter import (
+    _REPAIR_NOTE,
+    _build_structured_answers_prompt,
+    _cached_response,
+    _call_one,
+    _candidate_models,
+    _fallback_structured_answers,
+    _parse_structured_answers,
+    _request_body,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds the primary model gets before the first fallback is started alongside it.
+HEDGE_DELAY_SECONDS = 5.0
+
+
+async def _call_gemini_async(prompt: str) -> str:
+    """Async counterpart of _call_gemini that hedges slow primaries.
+
+    The primary model runs on a worker thread; if it has not answered within
+    HEDGE_DELAY_SECONDS the first fallback is started too and whichever
+    succeeds first wins. Remaining models are then tried one at a time.
+    """
+    models = _candidate_models()
+    cached = _cached_response(prompt, models[0])
+    if cached is not None:
+        return cached
+
+    payload = _request_body(prompt)
+    errors: list[str] = []
+    pending: dict[asyncio.Task, str] = {}
+    queue = list(models)
+
+    def launch() -> None:
+        model = queue.pop(0)
+        pending[asyncio.create_task(asyncio.to_thread(_call_one, prompt, payload, model))] = model
+
+    launch()
+    hedged = False
+    try:
+        while pending:
+            timeout = HEDGE_DELAY_SECONDS if queue and not hedged else None
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                hedged = True
+                logger.info("Model %s is slow, starting %s alongside it", models[0], queue[0])
+                launch()
+                continue
+            for task in done:
+                model = pending.pop(task)
+                try:
+                    return task.result()
+                except Exception as exc:
+                    errors.append(f"{model}: {exc}")
+                    logger.warning("Model %s failed, trying next fallback if available", model)
+            if not pending and queue:
+                launch()
+    finally:
+        # Threads can't be interrupted; a losing request finishes in the background
+        # and, if it was the primary model, still lands in the response cache.
+        for task in pending:
+            task.cancel()
+
+    raise RuntimeError("All Gemini models failed. " + " | ".join(errors))
+
+
+async def generate_structured_answers_async(
+    assignment: Assignment,
+    style_examples: list[str],
+    material_texts: list[str],
+    question_snippets: list[str],
+    attachment_summary: str,
+) -> list[dict[str, str]]:
+    """Non-blocking generate_structured_answers for use inside the browser loop."""
+    if not question_snippets:
+        return []
+
+    prompt = _build_structured_answers_prompt(
+        assignment=assignment,
+        style_examples=style_examples,
+        material_texts=material_texts,
+        question_snippets=question_snippets,
+        attachment_summary=attachment_summary,
+    )
+
+    raw = await _call_gemini_async(prompt)
+    parsed = _parse_structured_answers(raw, question_snippets)
+    if parsed:
+        return parsed
+
+    repaired = await _call_gemini_async(prompt + _REPAIR_NOTE)
+    parsed = _parse_structured_answers(repaired, question_snippets)
+    if parsed:
+        return parsed
+
+    return _fallback_structured_answers(raw or repaired, question_snippets)
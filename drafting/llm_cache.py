@@ -0,0 +1,67 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        path = settings.llm_cache_file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL)"
+        )
+        _conn = conn
+    return _conn
+
+
+def _key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+
+def get(model: str, prompt: str) -> str | None:
+    """Return the stored response for exactly this model and prompt, if any.
+
+    Entries older than LLM_CACHE_TTL_HOURS are treated as missing.
+    """
+    if not settings.llm_cache_enabled:
+        return None
+    try:
+        with _lock:
+            row = _connect().execute(
+                "SELECT response, created_at FROM responses WHERE key = ?",
+                (_key(model, prompt),),
+            ).fetchone()
+    except Exception as exc:
+        logger.warning("Failed to read LLM cache; ignoring: %s", exc)
+        return None
+    if not row or time.time() - float(row[1] or 0) > settings.llm_cache_ttl_hours * 3600:
+        return None
+    return row[0]
+
+
+def put(model: str, prompt: str, response: str) -> None:
+    if not settings.llm_cache_enabled:
+        return
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (_key(model, prompt), model, response, time.time()),
+            )
+            conn.commit()
+    except Exception as exc:
+        logger.warning("Failed to write LLM cache: %s", exc)
@@ -1,82 +1,128 @@
 import json
 import logging
+import random
 import re
+import threading
 import time
-import urllib.request
-import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Any
 
+import urllib3
+
+try:
+    import orjson
+except ImportError:  # optional: faster parsing of API responses and JSON answers
+    orjson = None
+
 from config.settings import settings
 from classroom.scanner import Assignment
+from drafting import llm_cache
 
 logger = logging.getLogger(__name__)
 
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={key}"
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
 MAX_RETRIES = 4
+# Longest server-requested Retry-After we wait out; anything longer moves on to
+# the next model instead of sleeping while holding an in-flight slot.
+MAX_RETRY_AFTER_SECONDS = 60.0
 FALLBACK_MODELS = ["gemma-3-1b-it"]
 
+# One pool for the process so primary and fallback model calls reuse the same
+# keep-alive TLS connection to the API host. Retries are handled in _call_model.
+_HTTP = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=8,
+    retries=False,
+    timeout=urllib3.Timeout(connect=10, read=60),
+)
+_IN_FLIGHT = threading.Semaphore(max(1, settings.gemini_max_concurrency))
+
+# _clean_student_style_text: plain punctuation and newlines in one translate pass
+_STYLE_CHARS = str.maketrans(
+    {"\r": "\n", "—": "-", "–": "-", "“": '"', "”": '"', "’": "'", ";": ","}
+)
+# _clean_student_style_text: strip markdown, tags and list markers from drafts
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_UNDER_RE = re.compile(r"__(.+?)__")
+_CODE_RE = re.compile(r"`([^`]+)`")
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s*", re.MULTILINE)
+_TEXT_TAG_RE = re.compile(r"<\s*/?\s*text\s*>", re.IGNORECASE)
+_ANSWER_TAG_RE = re.compile(r"<\s*/?\s*answer\s*>", re.IGNORECASE)
+_ANY_TAG_RE = re.compile(r"<[^>]{1,50}>")
+_BULLET_RE = re.compile(r"^\s*[-*]\s+", re.MULTILINE)
+_PUNCT_RUN_RE = re.compile(r"([!?.,])\1+")
+_SPACES_RE = re.compile(r"[ \t]+")
+_NEWLINES_RE = re.compile(r"\n{3,}")
+
+_TEMPLATE_WORDS = ("question", "prompt", "response", "answer")
+_TEMPLATE_HINT_RE = re.compile(r"_{3,}|\[\s*\]|\(\s*\)|\b(question|prompt|response|answer)\b", re.IGNORECASE)
+_FENCE_OPEN_RE = re.compile(r"^\s*```(?:json)?\s*", re.IGNORECASE)
+_FENCE_CLOSE_RE = re.compile(r"\s*```\s*$")
+_JSON_OBJECT_RE = re.compile(r"\{[\s\S]*\}")
+_JSON_ARRAY_RE = re.compile(r"\[[\s\S]*\]")
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n+")
+
 
 def _clean_student_style_text(text: str) -> str:
-    cleaned = text.replace("\r\n", "\n").replace("\r", "\n").strip()
-    cleaned = cleaned.replace("—", "-").replace("–", "-")
-    cleaned = cleaned.replace("“", '"').replace("”", '"').replace("’", "'")
-    cleaned = cleaned.replace(";", ",")
-    cleaned = re.sub(r"\*\*(.+?)\*\*", r"\1", cleaned)
-    cleaned = re.sub(r"__(.+?)__", r"\1", cleaned)
-    cleaned = re.sub(r"`([^`]+)`", r"\1", cleaned)
-    cleaned = re.sub(r"^\s*#{1,6}\s*", "", cleaned, flags=re.MULTILINE)
-    cleaned = re.sub(r"<\s*/?\s*text\s*>", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"<\s*/?\s*answer\s*>", "", cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r"<[^>]{1,50}>", "", cleaned)
-    cleaned = re.sub(r"^\s*[-*]\s+", "", cleaned, flags=re.MULTILINE)
-    cleaned = re.sub(r"([!?.,])\1+", r"\1", cleaned)
-    cleaned = re.sub(r"[ \t]+", " ", cleaned)
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
+    cleaned = text.replace("\r\n", "\n").translate(_STYLE_CHARS).strip()
+    cleaned = _BOLD_RE.sub(r"\1", cleaned)
+    cleaned = _UNDER_RE.sub(r"\1", cleaned)
+    cleaned = _CODE_RE.sub(r"\1", cleaned)
+    cleaned = _HEADING_RE.sub("", cleaned)
+    cleaned = _TEXT_TAG_RE.sub("", cleaned)
+    cleaned = _ANSWER_TAG_RE.sub("", cleaned)
+    cleaned = _ANY_TAG_RE.sub("", cleaned)
+    cleaned = _BULLET_RE.sub("", cleaned)
+    cleaned = _PUNCT_RUN_RE.sub(r"\1", cleaned)
+    cleaned = _SPACES_RE.sub(" ", cleaned)
+    cleaned = _NEWLINES_RE.sub("\n\n", cleaned)
     return cleaned.strip()
 
 
+def _join_head(texts: list[str], limit: int) -> str:
+    """Same as "\n".join(texts)[:limit] without joining past the limit."""
+    parts: list[str] = []
+    size = 0
+    for i, text in enumerate(texts):
+        if i:
+            parts.append("\n")
+            size += 1
+        parts.append(text[: limit - size])
+        size += len(parts[-1])
+        if size >= limit:
+            break
+    return "".join(parts)[:limit]
+
+
 def _materials_look_like_template(material_texts: list[str]) -> bool:
     if not material_texts:
         return False
-    combined = "\n".join(material_texts)[:15000]
-    return bool(re.search(r"_{3,}|\[\s*\]|\(\s*\)|\b(question|prompt|response|answer)\b", combined, flags=re.IGNORECASE))
+    combined = _join_head(material_texts, 15000)
+    # Substring checks run in C; the regex only runs when one of them can't decide.
+    if "___" in combined or "[]" in combined or "()" in combined:
+        return True
+    folded = combined.casefold()
+    if "[" not in combined and "(" not in combined and not any(w in folded for w in _TEMPLATE_WORDS):
+        return False
+    return bool(_TEMPLATE_HINT_RE.search(combined))
 
 
-def _build_prompt(
-    assignment: Assignment,
-    style_examples: list[str],
-    material_texts: list[str],
-) -> str:
-    examples_block = ""
-    for i, ex in enumerate(style_examples, 1):
-        examples_block += f"\n--- Example {i} of my past writing ---\n{ex}\n"
-
-    materials_block = ""
-    for i, mt in enumerate(material_texts, 1):
-        materials_block += f"\n--- Attached Material {i} ---\n{mt}\n"
-
-    template_mode = _materials_look_like_template(material_texts)
-    if template_mode:
-        output_rules = (
-            "OUTPUT FORMAT RULES:\n"
-            "- Keep answers aligned to template order\n"
-            "- Return exactly one block per box/question\n"
-            "- Use this exact format:\n"
-            "[Answer 1]\\nactual answer for first box\\n\\n[Answer 2]\\nactual answer for second box\n"
-            "- Do not include markdown, bold markers, headings, or bullet lists\n"
-            "- Do not use placeholder text like <text> or [insert]\n"
-        )
-    else:
-        output_rules = (
-            "OUTPUT FORMAT RULES:\n"
-            "- If there are numbered questions, answer each one on its own line with the question number (e.g. '1. answer here')\n"
-            "- Put each answer in its RESPECTIVE position -- never combine answers\n"
-            "- Return plain assignment text only\n"
-            "- No markdown, no bold markers, no heading symbols\n"
-            "- No placeholder text like <text> or [insert]\n"
-        )
+def _examples_block(style_examples: list[str]) -> str:
+    return "".join(
+        f"\n--- Example {i} of my past writing ---\n{ex}\n"
+        for i, ex in enumerate(style_examples, 1)
+    )
 
-    return f"""You are writing a homework response in a student's personal voice.
+
+def _materials_block(material_texts: list[str]) -> str:
+    return "".join(
+        f"\n--- Attached Material {i} ---\n{mt}\n"
+        for i, mt in enumerate(material_texts, 1)
+    )
+
+
+_DRAFT_PROMPT_HEADER = """You are writing a homework response in a student's personal voice.
 
 CRITICAL RULES:
 - Match the student's writing style and punctuation from the examples as closely as possible
@@ -93,7 +139,42 @@ CRITICAL RULES:
 - Carefully read all on-screen instructions in the template before answering
 
 STUDENT'S WRITING STYLE EXAMPLES:
-{examples_block}
+"""
+
+_TEMPLATE_OUTPUT_RULES = (
+    "OUTPUT FORMAT RULES:\n"
+    "- Keep answers aligned to template order\n"
+    "- Return exactly one block per box/question\n"
+    "- Use this exact format:\n"
+    "[Answer 1]\\nactual answer for first box\\n\\n[Answer 2]\\nactual answer for second box\n"
+    "- Do not include markdown, bold markers, headings, or bullet lists\n"
+    "- Do not use placeholder text like <text> or [insert]\n"
+)
+
+_PLAIN_OUTPUT_RULES = (
+    "OUTPUT FORMAT RULES:\n"
+    "- If there are numbered questions, answer each one on its own line with the question number (e.g. '1. answer here')\n"
+    "- Put each answer in its RESPECTIVE position -- never combine answers\n"
+    "- Return plain assignment text only\n"
+    "- No markdown, no bold markers, no heading symbols\n"
+    "- No placeholder text like <text> or [insert]\n"
+)
+
+
+def _build_prompt(
+    assignment: Assignment,
+    style_examples: list[str],
+    material_texts: list[str],
+) -> str:
+    examples_block = _examples_block(style_examples)
+    materials_block = _materials_block(material_texts)
+
+    if _materials_look_like_template(material_texts):
+        output_rules = _TEMPLATE_OUTPUT_RULES
+    else:
+        output_rules = _PLAIN_OUTPUT_RULES
+
+    return _DRAFT_PROMPT_HEADER + f"""{examples_block}
 
 ASSIGNMENT INFO:
 Class: {assignment.course_name}
@@ -114,13 +195,8 @@ def _build_structured_answers_prompt(
     question_snippets: list[str],
     attachment_summary: str,
 ) -> str:
-    examples_block = ""
-    for i, ex in enumerate(style_examples, 1):
-        examples_block += f"\n--- Example {i} of my past writing ---\n{ex}\n"
-
-    materials_block = ""
-    for i, mt in enumerate(material_texts, 1):
-        materials_block += f"\n--- Attached Material {i} ---\n{mt}\n"
+    examples_block = _examples_block(style_examples)
+    materials_block = _materials_block(material_texts)
 
     questions_block = "\n".join(f"{i}. {q}" for i, q in enumerate(question_snippets, start=1))
 
@@ -169,31 +245,40 @@ DETECTED QUESTIONS (IN ORDER):
 Now return the JSON object only."""
 
 
+def _json_loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # stdlib is more lenient (NaN, Infinity); let it decide
+    return json.loads(data)
+
+
 def _extract_json_payload(text: str) -> Any | None:
     raw = (text or "").strip()
     if not raw:
         return None
 
-    cleaned = re.sub(r"^\s*```(?:json)?\s*", "", raw, flags=re.IGNORECASE)
-    cleaned = re.sub(r"\s*```\s*$", "", cleaned).strip()
+    cleaned = _FENCE_OPEN_RE.sub("", raw)
+    cleaned = _FENCE_CLOSE_RE.sub("", cleaned).strip()
 
     for candidate in (cleaned, raw):
         try:
-            return json.loads(candidate)
+            return _json_loads(candidate)
         except Exception:
             pass
 
-    obj_match = re.search(r"\{[\s\S]*\}", cleaned)
+    obj_match = _JSON_OBJECT_RE.search(cleaned)
     if obj_match:
         try:
-            return json.loads(obj_match.group(0))
+            return _json_loads(obj_match.group(0))
         except Exception:
             pass
 
-    arr_match = re.search(r"\[[\s\S]*\]", cleaned)
+    arr_match = _JSON_ARRAY_RE.search(cleaned)
     if arr_match:
         try:
-            return json.loads(arr_match.group(0))
+            return _json_loads(arr_match.group(0))
         except Exception:
             pass
 
@@ -205,7 +290,7 @@ def _split_fallback_answers(text: str, count: int) -> list[str]:
     if not cleaned:
         return []
 
-    blocks = [chunk.strip() for chunk in re.split(r"\n\s*\n+", cleaned) if chunk.strip()]
+    blocks = [chunk.strip() for chunk in _PARAGRAPH_SPLIT_RE.split(cleaned) if chunk.strip()]
     if not blocks:
         blocks = [cleaned]
 
@@ -274,6 +359,9 @@ def _parse_structured_answers(raw: str, question_snippets: list[str]) -> list[di
     return parsed
 
 
+_REPAIR_NOTE = "\n\nYour previous output was not valid JSON. Return ONLY valid JSON now using the exact schema."
+
+
 def generate_structured_answers(
     assignment: Assignment,
     style_examples: list[str],
@@ -297,16 +385,16 @@ def generate_structured_answers(
     if parsed:
         return parsed
 
-    repair_prompt = (
-        prompt
-        + "\n\nYour previous output was not valid JSON. Return ONLY valid JSON now using the exact schema."
-    )
-    repaired = _call_gemini(repair_prompt)
+    repaired = _call_gemini(prompt + _REPAIR_NOTE)
     parsed = _parse_structured_answers(repaired, question_snippets)
     if parsed:
         return parsed
 
-    fallback_chunks = _split_fallback_answers(raw or repaired, len(question_snippets))
+    return _fallback_structured_answers(raw or repaired, question_snippets)
+
+
+def _fallback_structured_answers(raw: str, question_snippets: list[str]) -> list[dict[str, str]]:
+    fallback_chunks = _split_fallback_answers(raw, len(question_snippets))
     if not fallback_chunks:
         fallback_chunks = ["I completed this response in my normal writing style."]
 
@@ -328,21 +416,129 @@ def generate_draft(
     return _clean_student_style_text(generated)
 
 
-def _candidate_models() -> list[str]:
-    models = [settings.gemini_model, *FALLBACK_MODELS]
+def generate_drafts_batch(
+    items: list[tuple[Assignment, list[str], list[str]]],
+    max_workers: int = 8,
+) -> list[str]:
+    """Draft several assignments at once; results come back in input order.
+
+    Each item is (assignment, style_examples, material_texts). Requests overlap
+    on a thread pool, capped overall by GEMINI_MAX_CONCURRENCY. A draft that
+    fails is returned as "" and logged.
+    """
+    prompts = [_build_prompt(a, examples, materials) for a, examples, materials in items]
+    drafts = [""] * len(prompts)
+    if not prompts:
+        return drafts
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as pool:
+        futures = {pool.submit(_call_gemini, prompt): i for i, prompt in enumerate(prompts)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                drafts[i] = _clean_student_style_text(future.result())
+            except Exception as exc:
+                logger.warning("Batch draft failed for %s: %s", items[i][0].title, exc)
+    return drafts
+
+
+def _candidate_models() -> tuple[str, ...]:
+    return _models_for(settings.gemini_model)
+
+
+@lru_cache(maxsize=8)
+def _models_for(primary: str) -> tuple[str, ...]:
+    """Primary model then fallbacks, deduplicated (keyed on the primary so a
+    changed GEMINI_MODEL is picked up)."""
     unique: list[str] = []
     seen = set()
-    for model in models:
+    for model in (primary, *FALLBACK_MODELS):
         if model and model not in seen:
             unique.append(model)
             seen.add(model)
-    return unique
+    return tuple(unique)
+
+
+@lru_cache(maxsize=16)
+def _model_url(model: str) -> str:
+    return GEMINI_URL.format(model=model)
+
+
+class _TokenBucket:
+    """Client-side request limiter: `rate` requests/second with bursts up to `cap`.
+
+    After a 429 the rate drops by a quarter for a minute, so callers slow down
+    before the server has to reject them again.
+    """
+
+    __slots__ = ("rate", "base_rate", "cap", "tokens", "ts", "slow_until", "lock")
+
+    def __init__(self, rate: float, cap: float) -> None:
+        self.rate = self.base_rate = rate
+        self.cap = cap
+        self.tokens = cap
+        self.ts = time.monotonic()
+        self.slow_until = 0.0
+        self.lock = threading.Lock()
 
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.cap, self.tokens + (now - self.ts) * self.rate)
+                self.ts = now
+                if self.slow_until and now >= self.slow_until:
+                    self.rate = self.base_rate
+                    self.slow_until = 0.0
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def slow_down(self, seconds: float = 60.0) -> None:
+        with self.lock:
+            self.rate = max(self.base_rate / 10, self.rate * 0.75)
+            self.slow_until = time.monotonic() + seconds
+
+
+_BUCKETS: dict[str, _TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def _bucket_for(model: str) -> _TokenBucket | None:
+    rpm = settings.gemini_rpm
+    if rpm <= 0:
+        return None
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(model)
+        if bucket is None:
+            bucket = _BUCKETS[model] = _TokenBucket(rate=rpm / 60, cap=max(1.0, min(10.0, rpm / 6)))
+        return bucket
+
+
+def _backoff_delay(
+    attempt: int, retry_after: str | None = None, base: float = 1.0
+) -> float | None:
+    """Seconds to wait before retrying after failed attempt number `attempt`.
+
+    A numeric Retry-After from the server wins, or None when it exceeds
+    MAX_RETRY_AFTER_SECONDS (the caller should give up on this model); otherwise
+    the delay doubles per attempt from `base` (capped at 32s) with 0.5-1.0x
+    jitter so parallel callers do not retry in lockstep.
+    """
+    if retry_after:
+        try:
+            delay = max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        else:
+            return delay if delay <= MAX_RETRY_AFTER_SECONDS else None
+    return min(32.0, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
 
-def _call_model(prompt: str, model: str) -> str:
-    url = GEMINI_URL.format(model=model, key=settings.gemini_api_key)
 
-    payload = json.dumps({
+def _request_body(prompt: str) -> bytes:
+    return json.dumps({
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {
             "temperature": 0.8,
@@ -350,19 +546,52 @@ def _call_model(prompt: str, model: str) -> str:
         },
     }).encode()
 
+
+def _call_model(payload: bytes, model: str) -> str:
+    url = _model_url(model)
+    # The key travels in a header so it never shows up in URLs, logs or tracebacks.
+    headers = {"Content-Type": "application/json", "x-goog-api-key": settings.gemini_api_key}
+
     logger.info("Calling Gemini model: %s", model)
 
+    bucket = _bucket_for(model)
     for attempt in range(1, MAX_RETRIES + 1):
+        if bucket:
+            bucket.acquire()
         try:
-            req = urllib.request.Request(
+            resp = _HTTP.request(
+                "POST",
                 url,
-                data=payload,
-                headers={"Content-Type": "application/json"},
-                method="POST",
+                body=payload,
+                headers=headers,
             )
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                raw_body = resp.read()
 
+            if resp.status >= 400:
+                body = resp.data.decode(errors="replace")
+                body_lower = body.lower()
+                hard_quota = "limit: 0" in body_lower
+
+                if resp.status == 429 and bucket:
+                    bucket.slow_down()
+                if resp.status == 429 and attempt < MAX_RETRIES and not hard_quota:
+                    retry_after = resp.headers.get("Retry-After")
+                    wait = _backoff_delay(attempt, retry_after)
+                    if wait is not None:
+                        logger.warning(
+                            "Rate limited on %s (429). Retrying in %.1fs (attempt %d/%d)",
+                            model,
+                            wait,
+                            attempt,
+                            MAX_RETRIES,
+                        )
+                        time.sleep(wait)
+                        continue
+                    logger.warning(
+                        "Rate limited on %s with Retry-After %ss; not waiting", model, retry_after
+                    )
+                raise RuntimeError(f"Gemini {model} HTTP {resp.status}: {body[:500]}")
+
+            raw_body = resp.data
             if not raw_body or not raw_body.strip():
                 if attempt < MAX_RETRIES:
                     wait = 10 * attempt
@@ -371,13 +600,16 @@ def _call_model(prompt: str, model: str) -> str:
                     continue
                 raise RuntimeError(f"Gemini {model} returned empty response body after retries")
 
-            data = json.loads(raw_body)
+            data = _json_loads(raw_body)
 
             candidates = data.get("candidates", [])
             if not candidates:
                 raise RuntimeError(f"Gemini returned no candidates: {data}")
 
-            text = (candidates[0].get("content", {}).get("parts", [{}])[0].get("text") or "").strip()
+            try:
+                text = candidates[0]["content"]["parts"][0]["text"].strip()
+            except (KeyError, IndexError, TypeError, AttributeError):
+                text = ""
             if not text:
                 if attempt < MAX_RETRIES:
                     wait = 10 * attempt
@@ -389,29 +621,11 @@ def _call_model(prompt: str, model: str) -> str:
             logger.info("Draft generated: %d chars", len(text))
             return text
 
-        except urllib.error.HTTPError as e:
-            body = e.read().decode(errors="replace")
-            body_lower = body.lower()
-            hard_quota = "limit: 0" in body_lower
-
-            if e.code == 429 and attempt < MAX_RETRIES and not hard_quota:
-                wait = 15 * attempt
-                logger.warning(
-                    "Rate limited on %s (429). Retrying in %ds (attempt %d/%d)",
-                    model,
-                    wait,
-                    attempt,
-                    MAX_RETRIES,
-                )
-                time.sleep(wait)
-            else:
-                raise RuntimeError(f"Gemini {model} HTTP {e.code}: {body[:500]}") from e
-
-        except urllib.error.URLError as e:
+        except urllib3.exceptions.HTTPError as e:
             if attempt < MAX_RETRIES:
-                wait = 5 * attempt
+                wait = _backoff_delay(attempt, base=0.5)
                 logger.warning(
-                    "Network error on %s: %s. Retrying in %ds (attempt %d/%d)",
+                    "Network error on %s: %s. Retrying in %.1fs (attempt %d/%d)",
                     model,
                     e,
                     wait,
@@ -425,12 +639,35 @@ def _call_model(prompt: str, model: str) -> str:
     raise RuntimeError(f"Gemini {model} failed after retries")
 
 
+def _cached_response(prompt: str, model: str) -> str | None:
+    # Only primary-model answers are cached, so a fallback reply is never reused
+    cached = llm_cache.get(model, prompt)
+    if cached is not None:
+        logger.info("Using cached %s response: %d chars", model, len(cached))
+    return cached
+
+
+def _call_one(prompt: str, payload: bytes, model: str) -> str:
+    with _IN_FLIGHT:
+        text = _call_model(payload, model)
+    if model == settings.gemini_model:
+        llm_cache.put(model, prompt, text)
+    return text
+
+
 def _call_gemini(prompt: str) -> str:
     errors: list[str] = []
+    models = _candidate_models()
 
-    for model in _candidate_models():
+    cached = _cached_response(prompt, models[0])
+    if cached is not None:
+        return cached
+
+    # Serialized once; retries and fallback models all send the same body.
+    payload = _request_body(prompt)
+    for model in models:
         try:
-            return _call_model(prompt, model)
+            return _call_one(prompt, payload, model)
         except Exception as exc:
             errors.append(f"{model}: {exc}")
             logger.warning("Model %s failed, trying next fallback if available", model)
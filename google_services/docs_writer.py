@@ -6,7 +6,15 @@ from config.settings import settings
 logger = logging.getLogger(__name__)
 
 
+# ASCII characters that can't appear in a draft filename map to "_"
+_ASCII_SANITIZE = str.maketrans(
+    {chr(c): "_" for c in range(128) if not (chr(c).isalnum() or chr(c) in " _-.")}
+)
+
+
 def _sanitize(name: str) -> str:
+    if name.isascii():
+        return name.translate(_ASCII_SANITIZE).strip()[:80]
     return "".join(c if c.isalnum() or c in " _-." else "_" for c in name).strip()[:80]
 
 
@@ -18,12 +26,8 @@ async def create_draft_doc(title: str, body_text: str) -> str:
     filename = f"{_sanitize(title)} - Draft.txt"
     filepath = drafts_dir / filename
 
-    filepath.write_text(
-        f"DRAFT: {title}\n"
-        f"{'=' * 60}\n\n"
-        f"{body_text}\n",
-        encoding="utf-8",
-    )
+    data = f"DRAFT: {title}\n{'=' * 60}\n\n{body_text}\n".encode("utf-8")
+    filepath.write_bytes(data)
 
     logger.info("Draft saved: %s", filepath)
     return str(filepath)
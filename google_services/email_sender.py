@@ -1,31 +1,29 @@
-import asyncio
 import logging
+from functools import cached_property
 
-from browser.session import get_page, safe_goto
+from playwright.async_api import Locator, Page
+
+from browser.session import get_page, lean_page, safe_goto
 
 logger = logging.getLogger(__name__)
 
 
-def _build_summary_body(items: list[dict]) -> str:
-    lines = ["StudyFlow Daily Summary", ""]
-    for item in items:
-        lines.append(
-            f"- {item['course_name']} | {item['title']} "
-            f"(Due: {item['due_date_str']})"
-        )
-        if item.get("draft_link"):
-            lines.append(f"  Draft: {item['draft_link']}")
-        if item.get("assignment_link"):
-            lines.append(f"  Assignment: {item['assignment_link']}")
-        lines.append("")
+def _summary_entry(item: dict) -> str:
+    return (
+        f"- {item['course_name']} | {item['title']} (Due: {item['due_date_str']})\n"
+        + (f"  Draft: {item['draft_link']}\n" if item.get("draft_link") else "")
+        + (f"  Assignment: {item['assignment_link']}\n" if item.get("assignment_link") else "")
+    )
 
-    lines.append("Review each draft, edit, then submit.")
-    return "\n".join(lines)
+
+def _build_summary_body(items: list[dict]) -> str:
+    entries = [_summary_entry(item) for item in items]
+    return "\n".join(["StudyFlow Daily Summary", "", *entries, "Review each draft, edit, then submit."])
 
 
 async def _set_body_text(body_editor, text: str) -> bool:
     try:
-        await body_editor.fill(text)
+        await body_editor.fill(text, timeout=10000)
         return True
     except Exception:
         pass
@@ -51,56 +49,80 @@ async def _set_body_text(body_editor, text: str) -> bool:
         return False
 
 
-async def send_daily_summary(items: list[dict], recipient_email: str = "") -> None:
-    if not items:
-        logger.info("No assignments processed, skipping email")
-        return
+class GmailPage:
+    """Compose-flow locators for one Gmail tab, each built on first use and reused."""
 
-    page = await get_page()
+    def __init__(self, page: Page) -> None:
+        self.page = page
 
-    try:
-        await safe_goto(page, "https://mail.google.com/mail/u/0/#inbox",
-                        wait_selector='[role="button"]')
-        await asyncio.sleep(4)
-
-        # Click compose
-        compose_btn = page.locator('[class*="T-I T-I-KE"], [role="button"]:has-text("Compose")').first
-        await compose_btn.click(timeout=15000)
-        await asyncio.sleep(1.5)
-
-        # Fill To
-        to_field = page.locator('[aria-label="To recipients"], [name="to"], input[aria-label*="To"]').first
-        await to_field.click()
-        await to_field.fill(recipient_email or "me")
-        await page.keyboard.press("Enter")
-        await asyncio.sleep(0.2)
-
-        # Fill Subject
-        subject_field = page.locator('[name="subjectbox"], [aria-label="Subject"]').first
-        await subject_field.click()
-        await subject_field.fill(f"StudyFlow: {len(items)} Draft(s) Ready for Review")
-        await asyncio.sleep(0.1)
-
-        # Fill Body
-        body_editor = page.locator(
+    @cached_property
+    def compose(self) -> Locator:
+        return self.page.locator('[class*="T-I T-I-KE"], [role="button"]:has-text("Compose")').first
+
+    @cached_property
+    def to_field(self) -> Locator:
+        return self.page.locator('[aria-label="To recipients"], [name="to"], input[aria-label*="To"]').first
+
+    @cached_property
+    def subject(self) -> Locator:
+        return self.page.locator('[name="subjectbox"], [aria-label="Subject"]').first
+
+    @cached_property
+    def body(self) -> Locator:
+        return self.page.locator(
             '[role="textbox"][aria-label*="Body"], '
             '[contenteditable="true"][aria-label*="Body"], '
             '[aria-label="Message Body"]'
         ).first
-        await body_editor.click()
-        await asyncio.sleep(0.1)
 
-        body_text = _build_summary_body(items)
-        body_ok = await _set_body_text(body_editor, body_text)
-        if not body_ok:
-            await page.keyboard.insert_text(body_text)
+    @cached_property
+    def send(self) -> Locator:
+        return self.page.locator('[role="button"][aria-label*="Send"], [data-tooltip*="Send"]').first
+
+    @cached_property
+    def sent_toast(self) -> Locator:
+        return self.page.locator('[role="alert"]:has-text("sent")').first
+
+    async def compose_and_send(self, to: str, subject: str, body_text: str) -> None:
+        await self.compose.wait_for(state="visible", timeout=15000)
+        await self.compose.click(timeout=15000)
+
+        await self.to_field.wait_for(state="visible", timeout=15000)
+        await self.to_field.click(timeout=10000)
+        await self.to_field.fill(to, timeout=10000)
+        await self.page.keyboard.press("Enter")
+
+        await self.subject.click(timeout=10000)
+        await self.subject.fill(subject, timeout=10000)
+
+        await self.body.click(timeout=10000)
+        if not await _set_body_text(self.body, body_text):
+            await self.page.keyboard.insert_text(body_text)
+
+        await self.send.click(timeout=15000)
+        try:
+            await self.sent_toast.wait_for(state="visible", timeout=5000)
+        except Exception:
+            logger.debug("No 'Message sent' toast seen; assuming the send went through")
 
-        await asyncio.sleep(0.3)
-        send_btn = page.locator('[role="button"][aria-label*="Send"], [data-tooltip*="Send"]').first
-        await send_btn.click(timeout=15000)
-        await asyncio.sleep(2)
 
-        logger.info("Summary email sent")
+async def send_daily_summary(items: list[dict], recipient_email: str = "") -> None:
+    if not items:
+        logger.info("No assignments processed, skipping email")
+        return
+
+    page = await get_page()
 
-    except Exception as exc:
-        logger.warning("Failed to send email via Gmail: %s", exc)
+    async with lean_page(page):
+        try:
+            await safe_goto(page, "https://mail.google.com/mail/u/0/#inbox",
+                            wait_selector='[role="button"]')
+            await GmailPage(page).compose_and_send(
+                to=recipient_email or "me",
+                subject=f"StudyFlow: {len(items)} Draft(s) Ready for Review",
+                body_text=_build_summary_body(items),
+            )
+            logger.info("Summary email sent")
+
+        except Exception as exc:
+            logger.warning("Failed to send email via Gmail: %s", exc)
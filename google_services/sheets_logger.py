@@ -1,12 +1,133 @@
 import asyncio
 import logging
+import re
+import threading
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any
+from urllib.parse import urlsplit
 
-from browser.session import new_page, safe_goto
+from playwright.async_api import Locator, Page
+
+from browser.session import lean_page, page_scope, safe_goto
+from classroom.playwright_utils import MOD_KEY
 from config.settings import settings
 
+try:
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+except ImportError:  # optional; the browser path is used without it
+    service_account = None
+
 logger = logging.getLogger(__name__)
 
+_SHEET_ID_RE = re.compile(r"/spreadsheets/d/([A-Za-z0-9_-]+)")
+_CELL_REF_RE = re.compile(r"\s*[A-Za-z]+(\d+)\s*$")
+_SHEETS_SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+# googleapiclient service objects are not thread-safe
+_API_LOCK = threading.Lock()
+# Rows staged by queue_assignment_log until flush_assignment_logs()
+_pending_rows: list[list[str]] = []
+
+_TSV_UNSAFE = str.maketrans({"\t": " ", "\r": " ", "\n": " "})
+
+
+async def _paste_rows(page: Page, rows: list[list[str]]) -> bool:
+    """Paste rows as TSV in one shortcut; Sheets splits it across cells and rows.
+
+    Returns False when the clipboard is unavailable so the caller can type instead.
+    """
+    tsv = "\n".join("\t".join(str(val).translate(_TSV_UNSAFE) for val in row) for row in rows)
+    try:
+        origin = "{0.scheme}://{0.netloc}".format(urlsplit(page.url))
+        await page.context.grant_permissions(["clipboard-read", "clipboard-write"], origin=origin)
+        await page.evaluate("t => navigator.clipboard.writeText(t)", tsv)
+        await page.keyboard.press(f"{MOD_KEY}+V")
+    except Exception as exc:
+        logger.debug("Clipboard paste unavailable, typing rows instead: %s", exc)
+        return False
+    return True
+
+
+async def _last_used_row(page: Page, name_box: Locator) -> int:
+    # Ctrl/Cmd+End jumps to the last used cell and the name box shows its reference
+    try:
+        await page.keyboard.press(f"{MOD_KEY}+End")
+        match = _CELL_REF_RE.match(await name_box.input_value(timeout=2000))
+        if match:
+            return int(match.group(1))
+    except Exception:
+        pass
+
+    # Fallback: scan the rendered cells (only sees rows currently in the viewport)
+    return await page.evaluate("""
+        () => {
+            const cells = document.querySelectorAll('[class*="cell-input"]');
+            let maxRow = 1;
+            for (const cell of cells) {
+                const parent = cell.closest('tr, [class*="row"]');
+                const row = parent ? parseInt(parent.dataset?.row || '0') : 0;
+                if (row > maxRow) maxRow = row;
+            }
+            return maxRow;
+        }
+    """)
+
+
+def _api_enabled() -> bool:
+    return bool(settings.google_service_account_file) and service_account is not None
+
+
+@lru_cache(maxsize=1)
+def _sheets_service(credentials_file: str) -> Any:
+    creds = service_account.Credentials.from_service_account_file(
+        credentials_file, scopes=_SHEETS_SCOPES
+    )
+    return build("sheets", "v4", credentials=creds, cache_discovery=False)
+
+
+def _append_rows_api(sheet_url: str, rows: list[list[str]]) -> None:
+    match = _SHEET_ID_RE.search(sheet_url)
+    if not match:
+        raise ValueError(f"No spreadsheet id in {sheet_url}")
+    service = _sheets_service(settings.google_service_account_file)
+    with _API_LOCK:
+        service.spreadsheets().values().append(
+            spreadsheetId=match.group(1),
+            range="A:F",
+            valueInputOption="USER_ENTERED",
+            insertDataOption="INSERT_ROWS",
+            body={"values": rows},
+        ).execute()
+
+
+def _row(
+    course_name: str, title: str, due_date_str: str, draft_link: str, status: str
+) -> list[str]:
+    now_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")
+    return [now_str, course_name, title, due_date_str, draft_link, status]
+
+
+def queue_assignment_log(
+    course_name: str,
+    title: str,
+    due_date_str: str,
+    draft_link: str,
+    status: str = "Draft Pasted - Ready for Review",
+) -> None:
+    """Stage a row for the next flush_assignment_logs() (one sheet load per run)."""
+    _pending_rows.append(_row(course_name, title, due_date_str, draft_link, status))
+
+
+async def flush_assignment_logs() -> None:
+    """Write staged rows; they stay queued for the next flush if the write fails."""
+    if not _pending_rows:
+        return
+    rows = _pending_rows[:]
+    if await log_assignments(rows) or not settings.studyflow_sheet_url:
+        # Only drop what was written; rows queued meanwhile wait for the next flush
+        del _pending_rows[: len(rows)]
+
 
 async def log_assignment(
     course_name: str,
@@ -15,56 +136,65 @@ async def log_assignment(
     draft_link: str,
     status: str = "Draft Pasted - Ready for Review",
 ) -> None:
+    await log_assignments([_row(course_name, title, due_date_str, draft_link, status)])
+
+
+async def log_assignments(rows: list[list[str]]) -> bool:
+    """Append rows to the log sheet with a single API call or a single page load.
+
+    Returns True once the rows have been written.
+    """
+    if not rows:
+        return True
     sheet_url = settings.studyflow_sheet_url
     if not sheet_url:
         logger.warning("No STUDYFLOW_SHEET_URL configured, skipping log")
-        return
+        return False
 
-    page = await new_page()
+    if _api_enabled():
+        try:
+            await asyncio.to_thread(_append_rows_api, sheet_url, rows)
+            logger.info("Logged %d row(s) to sheet via API", len(rows))
+            return True
+        except Exception:
+            logger.warning("Sheets API append failed, falling back to the browser", exc_info=True)
 
-    try:
-        await safe_goto(page, sheet_url, wait_selector='[class*="cell-input"], #waffle-grid-container')
-        await asyncio.sleep(3)
+    async with page_scope() as page, lean_page(page):
+        try:
+            await safe_goto(page, sheet_url, wait_selector='[class*="cell-input"], #waffle-grid-container')
 
-        now_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")
-        row_data = [now_str, course_name, title, due_date_str, draft_link, status]
+            # Find the name box and navigate to the right cell
+            name_box = page.locator('[class*="jfk-textinput"], #t-name-box').first
+            try:
+                await name_box.wait_for(state="visible", timeout=15000)
 
-        # Find the name box and navigate to the right cell
-        name_box = page.locator('[class*="jfk-textinput"], #t-name-box').first
-        try:
-            await name_box.click()
-
-            # Find next empty row
-            last_row = await page.evaluate("""
-                () => {
-                    const cells = document.querySelectorAll('[class*="cell-input"]');
-                    let maxRow = 1;
-                    for (const cell of cells) {
-                        const parent = cell.closest('tr, [class*="row"]');
-                        const row = parent ? parseInt(parent.dataset?.row || '0') : 0;
-                        if (row > maxRow) maxRow = row;
-                    }
-                    return maxRow;
-                }
-            """)
-            next_row = max(last_row + 1, 2)
-
-            await name_box.fill(f"A{next_row}")
-            await page.keyboard.press("Enter")
-            await asyncio.sleep(0.5)
-
-            for val in row_data:
-                await page.keyboard.type(str(val), delay=10)
-                await page.keyboard.press("Tab")
-                await asyncio.sleep(0.3)
-
-            await asyncio.sleep(1)
-            logger.info("Logged to sheet: %s - %s", course_name, title)
+                # Find next empty row
+                last_row = await _last_used_row(page, name_box)
+                next_row = max(last_row + 1, 2)
+                await name_box.click(timeout=10000)
 
-        except Exception:
-            logger.warning("Could not write to name box, trying direct cell input")
+                await name_box.fill(f"A{next_row}", timeout=10000)
+                await page.keyboard.press("Enter")
 
-    except Exception:
-        logger.exception("Failed to log to sheet")
-    finally:
-        await page.close()
+                if not await _paste_rows(page, rows):
+                    for offset, row_data in enumerate(rows):
+                        if offset:
+                            await name_box.click(timeout=10000)
+                            await name_box.fill(f"A{next_row + offset}", timeout=10000)
+                            await page.keyboard.press("Enter")
+                        for val in row_data:
+                            await page.keyboard.insert_text(str(val))
+                            await page.keyboard.press("Tab")
+
+                # Let Sheets save before the tab is parked on about:blank
+                await asyncio.sleep(1)
+                for row_data in rows:
+                    logger.info("Logged to sheet: %s - %s", row_data[1], row_data[2])
+                return True
+
+            except Exception:
+                logger.warning("Could not write to name box, trying direct cell input")
+
+        except Exception:
+            logger.exception("Failed to log to sheet")
+    return False
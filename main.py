@@ -3,6 +3,7 @@ import argparse
 import logging
 import os
 import sys
+from logging.handlers import MemoryHandler
 from pathlib import Path
 from typing import Any
 
@@ -10,6 +11,11 @@ sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from config.settings import settings
 
+LOG_FILE = settings.project_root / "studyflow.log"
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+# studyflow.log is written in batches of this many records (errors flush at once)
+LOG_BUFFER_RECORDS = 512
+
 
 def _print_local_delivery_summary(final_state: dict[str, Any] | None) -> None:
     state = final_state or {}
@@ -40,14 +46,47 @@ def _print_local_delivery_summary(final_state: dict[str, Any] | None) -> None:
     print("========================================\n")
 
 
+class _BatchedFileHandler(MemoryHandler):
+    """Buffers records and appends them to the log file in a single write.
+
+    Flushes every LOG_BUFFER_RECORDS records, on ERROR, and at interpreter exit
+    (logging's own atexit hook closes handlers, which flushes).
+    """
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(
+            capacity=LOG_BUFFER_RECORDS,
+            flushLevel=logging.ERROR,
+            target=logging.FileHandler(path),
+        )
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if not (self.buffer and self.target):
+                return
+            try:
+                text = "".join(self.format(record) + "\n" for record in self.buffer)
+                self.target.acquire()
+                try:
+                    self.target.stream.write(text)
+                    self.target.stream.flush()
+                finally:
+                    self.target.release()
+            except Exception:
+                self.handleError(self.buffer[-1])
+            self.buffer.clear()
+        finally:
+            self.release()
+
+
 def setup_logging():
-    log_file = settings.project_root / "studyflow.log"
     logging.basicConfig(
         level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        format=LOG_FORMAT,
         handlers=[
             logging.StreamHandler(sys.stdout),
-            logging.FileHandler(log_file),
+            _BatchedFileHandler(LOG_FILE),
         ],
     )
 
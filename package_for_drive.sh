@@ -5,6 +5,7 @@ cd "$(dirname "$0")"
 zip -r ~/Desktop/studyflow_assistant.zip . \
     -x ".git/*" \
     -x ".browser_data/*" \
+    -x ".cache/*" \
     -x "venv/*" \
     -x "__pycache__/*" \
     -x "*/__pycache__/*" \
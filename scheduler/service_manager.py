@@ -4,6 +4,7 @@ import re
 import subprocess
 import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from config.settings import settings
@@ -12,7 +13,7 @@ SERVICE_LABEL = "com.studyflow.assistant"
 LAUNCH_AGENTS_DIR = Path.home() / "Library" / "LaunchAgents"
 
 
-@dataclass
+@dataclass(frozen=True)
 class ServiceInfo:
     label: str
     domain: str
@@ -24,6 +25,7 @@ class ServiceInfo:
     stderr_log_path: Path
 
 
+@lru_cache(maxsize=1)
 def _resolve_python_path() -> Path:
     venv_python = settings.project_root / "venv" / "bin" / "python"
     if venv_python.exists():
@@ -31,6 +33,7 @@ def _resolve_python_path() -> Path:
     return Path(sys.executable)
 
 
+@lru_cache(maxsize=1)
 def get_service_info() -> ServiceInfo:
     project_root = settings.project_root
     log_dir = project_root / "service_logs"
@@ -1,6 +1,9 @@
+import codecs
 import logging
+import os
 import random
 from pathlib import Path
+from typing import Iterable
 
 from config.settings import settings
 
@@ -9,6 +12,44 @@ logger = logging.getLogger(__name__)
 SUPPORTED_EXTENSIONS = {".txt", ".md", ".docx", ".pdf"}
 NUM_EXAMPLES = 6
 
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_PARAGRAPH = _W_NS + "p"
+_W_TEXT = _W_NS + "t"
+
+PDF_TEXT_LIMIT = 3000
+_READ_BLOCK = 64 * 1024
+# ASCII control characters other than newline and tab, deleted from PDF text
+_ASCII_UNPRINTABLE = str.maketrans(
+    {chr(c): None for c in range(128) if not (chr(c).isprintable() or chr(c) in "\n\t")}
+)
+
+
+def _printable_text(chunk: str) -> str:
+    if chunk.isascii():
+        return chunk.translate(_ASCII_UNPRINTABLE)
+    return "".join(c for c in chunk if c.isprintable() or c in "\n\t")
+
+
+def _printable_prefix(path: Path, limit: int) -> str:
+    """First `limit` printable characters of the file decoded as lenient UTF-8.
+
+    Reads in blocks and stops once enough text is collected, so a large PDF is
+    not read or filtered past the part that is kept.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    parts: list[str] = []
+    size = 0
+    with open(path, "rb") as f:
+        while size < limit:
+            block = f.read(_READ_BLOCK)
+            text = decoder.decode(block, final=not block)
+            kept = _printable_text(text)
+            parts.append(kept)
+            size += len(kept)
+            if not block:
+                break
+    return "".join(parts)[:limit]
+
 
 def _read_text_file(path: Path) -> str:
     if path.suffix == ".docx":
@@ -16,51 +57,71 @@ def _read_text_file(path: Path) -> str:
             import zipfile
             import xml.etree.ElementTree as ET
 
-            with zipfile.ZipFile(path) as z:
-                xml_content = z.read("word/document.xml")
-            root = ET.fromstring(xml_content)
-            ns = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
-            paragraphs = root.findall(".//w:p", ns)
-            return "\n".join(
-                "".join(node.text or "" for node in p.findall(".//w:t", ns))
-                for p in paragraphs
-            )
+            paragraphs: list[str] = []
+            runs: list[str] = []
+            # Stream the XML: text is collected per paragraph and each finished
+            # paragraph element is cleared, so the document tree is never held whole
+            with zipfile.ZipFile(path) as z, z.open("word/document.xml") as xml_stream:
+                for _, elem in ET.iterparse(xml_stream, events=("end",)):
+                    if elem.tag == _W_TEXT:
+                        runs.append(elem.text or "")
+                    elif elem.tag == _W_PARAGRAPH:
+                        paragraphs.append("".join(runs))
+                        runs.clear()
+                        elem.clear()
+            return "\n".join(paragraphs)
         except Exception:
             return f"[DOCX file: {path.name}]"
 
     if path.suffix == ".pdf":
         try:
-            with open(path, "rb") as f:
-                content = f.read()
-            text = content.decode("utf-8", errors="ignore")
-            printable = "".join(c for c in text if c.isprintable() or c in "\n\t")
-            return printable[:3000]
+            return _printable_prefix(path, PDF_TEXT_LIMIT)
         except Exception:
             return f"[PDF file: {path.name}]"
 
     return path.read_text(encoding="utf-8", errors="ignore")
 
 
+def _reservoir_sample(items: Iterable[str], k: int) -> list[str]:
+    """Uniform random sample of up to k items without materializing the input."""
+    reservoir: list[str] = []
+    for i, item in enumerate(items):
+        if i < k:
+            reservoir.append(item)
+        else:
+            j = random.randrange(i + 1)
+            if j < k:
+                reservoir[j] = item
+    # Like random.sample, return the picks in random order
+    random.shuffle(reservoir)
+    return reservoir
+
+
 def load_style_examples(count: int = NUM_EXAMPLES) -> list[str]:
     past_dir = settings.past_work_dir
     if not past_dir.exists():
         logger.warning("Past work directory not found: %s", past_dir)
         return []
 
-    files = [
-        f
-        for f in past_dir.iterdir()
-        if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS
-    ]
+    # scandir's entries carry the file type from the directory read, so no stat per file
+    with os.scandir(past_dir) as entries:
+        selected = _reservoir_sample(
+            (
+                entry.path
+                for entry in entries
+                if os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS
+                and entry.is_file()
+            ),
+            count,
+        )
 
-    if not files:
+    if not selected:
         logger.warning("No past work samples found in %s", past_dir)
         return []
 
-    selected = random.sample(files, min(count, len(files)))
     examples = []
 
-    for f in selected:
+    for f in map(Path, selected):
         text = _read_text_file(f)
         if text and len(text) > 50:
             trimmed = text[:2000]
@@ -1,8 +1,9 @@
-import json
 import os
-import urllib.request
-import urllib.error
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
 from flask import Flask, render_template, request, jsonify
+from requests.adapters import HTTPAdapter
 
 app = Flask(__name__)
 
@@ -10,34 +11,60 @@ GEMINI_KEY = os.environ.get("GEMINI_API_KEY", "")
 GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={key}"
 MODELS = ["gemini-2.0-flash", "gemma-3-1b-it"]
 
+# One keep-alive session for the process so /generate reuses the TLS connection
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+# Query all MODELS in parallel instead of falling back one by one (GEMINI_RACE_MODELS=0 to disable)
+RACE_MODELS = os.environ.get("GEMINI_RACE_MODELS", "1") != "0"
+POOL = ThreadPoolExecutor(max_workers=8)
+
 STYLE_EXAMPLES = [
     "Hope, because it keeps going and is the reason why I continue to do the stuff that I do. Honor because I was born with respect to my duty and my loved ones. Integrity, because I was raised to not cheat people. Fairness because I believe in helping everyone and keeping them to the same standard. Honesty, goes with honor, it is part of your duty to be honest with your loved ones.",
     "With many of my business endeavours, I often had to choose with being honest with my clients about the progress of the work, and sometimes I would have a lot of other stuff to focus on too, so sometimes progress gets delayed, but I would try to remain honest with them about it, and then quickly finish it.",
 ]
 
 
+def _ask(model, payload):
+    url = GEMINI_URL.format(model=model, key=GEMINI_KEY)
+    try:
+        resp = SESSION.post(url, json=payload, timeout=30)
+        resp.raise_for_status()
+        data = resp.json()
+        text = data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
+        return text.strip() or None
+    except Exception:
+        return None
+
+
 def call_gemini(prompt):
-    for model in MODELS:
-        url = GEMINI_URL.format(model=model, key=GEMINI_KEY)
-        payload = json.dumps({
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {"temperature": 0.7, "maxOutputTokens": 2048},
-        }).encode()
-        req = urllib.request.Request(url, data=payload, headers={"Content-Type": "application/json"}, method="POST")
-        try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                data = json.loads(resp.read())
-            text = data.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-            if text.strip():
-                return text.strip()
-        except Exception:
-            continue
+    payload = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {"temperature": 0.7, "maxOutputTokens": 2048},
+    }
+    if not RACE_MODELS:
+        for model in MODELS:
+            text = _ask(model, payload)
+            if text:
+                return text
+        return None
+
+    # Ask every model at once; first non-empty answer wins, earlier models
+    # preferred when several finish together
+    pending = {POOL.submit(_ask, model, payload): i for i, model in enumerate(MODELS)}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in sorted(done, key=pending.get):
+            del pending[future]
+            text = future.result()
+            if text:
+                for other in pending:
+                    other.cancel()
+                return text
     return None
 
 
-def build_prompt(title, course, instructions):
-    style_block = "\n\n".join(STYLE_EXAMPLES)
-    return f"""You are writing a homework response in a student's personal voice.
+STYLE_BLOCK = "\n\n".join(STYLE_EXAMPLES)
+PROMPT_TEMPLATE = """You are writing a homework response in a student's personal voice.
 
 CRITICAL RULES:
 - Match this student's writing style: casual, simple punctuation (periods/commas), no semicolons or em dashes
@@ -54,7 +81,7 @@ STUDENT'S WRITING STYLE EXAMPLES:
 ASSIGNMENT:
 Title: {title}
 Course: {course}
-Instructions: {instructions[:3000]}
+Instructions: {instructions}
 
 OUTPUT RULES:
 - If there are numbered questions, format as "1. answer\\n2. answer" etc.
@@ -64,6 +91,12 @@ OUTPUT RULES:
 Write the complete assignment response now. Output ONLY the answer text."""
 
 
+def build_prompt(title, course, instructions):
+    return PROMPT_TEMPLATE.format(
+        title=title, course=course, instructions=instructions[:3000], style_block=STYLE_BLOCK
+    )
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -21,7 +21,7 @@ from classroom.paster import paste_draft
 from style.loader import load_style_examples
 from drafting.llm_drafter import generate_draft
 from google_services.docs_writer import create_draft_doc
-from google_services.sheets_logger import log_assignment
+from google_services.sheets_logger import flush_assignment_logs, queue_assignment_log
 from google_services.email_sender import send_daily_summary
 from browser.ap_session import close_ap_browser
 from browser.session import close_browser
@@ -506,21 +506,14 @@ def process_assignment_node(state: WorkflowState) -> dict:
         )
 
         logger.info("  Step 5/5: Logging assignment")
-        try:
-            _run_async(
-                log_assignment(
-                    course_name=a.course_name,
-                    title=a.title,
-                    due_date_str=a.due_date_str or "No due date",
-                    draft_link=doc_link,
-                    status=status_text,
-                ),
-                timeout_seconds=45,
-            )
-        except TimeoutError:
-            logger.warning("  Sheet logging timed out; continuing")
-        except Exception:
-            logger.exception("  Failed to log assignment")
+        # Written to the sheet in one batch by summary_node
+        queue_assignment_log(
+            course_name=a.course_name,
+            title=a.title,
+            due_date_str=a.due_date_str or "No due date",
+            draft_link=doc_link,
+            status=status_text,
+        )
 
         processed.append(
             {
@@ -598,7 +591,18 @@ def delay_node(state: WorkflowState) -> dict:
     return {}
 
 
+def _flush_sheet_log() -> None:
+    try:
+        _run_async(flush_assignment_logs(), timeout_seconds=120)
+    except TimeoutError:
+        logger.warning("Sheet logging timed out; continuing")
+    except Exception:
+        logger.exception("Failed to log assignments")
+
+
 def summary_node(state: WorkflowState) -> dict:
+    _flush_sheet_log()
+
     logger.info("=== Sending daily summary ===")
     mode = os.getenv("STUDYFLOW_MODE", "").lower()
     if settings.send_email_summary:
@@ -696,6 +700,9 @@ def run_workflow() -> WorkflowState:
             return cast(WorkflowState, final_state)
         return initial_state
     finally:
+        # Rows queued by runs that never reached summary_node (an exception, the
+        # recursion limit) are written here; after a normal run this is a no-op.
+        _flush_sheet_log()
         if os.getenv("STUDYFLOW_MODE", "").lower() != "schedule":
             _shutdown_async_loop()
         _release_run_lock(lock_file)